@@ -0,0 +1,95 @@
+# Supply shortfall detection for the Water Supply Dashboard
+
+import time
+
+import numpy as np
+import pandas as pd
+from constants import SHORTFALL_RATIO, SHORTFALL_STREAK_WEIGHT, ZERO_SUPPLY_STREAK_WEIGHT
+
+DATE_COL = 'Date (Prev 7 days)'
+EXPECTED_COL = 'Expected water delivery'
+SUPPLIED_COL = 'Water Supplied (in kl)'
+
+def _streaks(flags, starts):
+    """Length of the run of True values ending at each row, restarting at every group start"""
+    positions = np.arange(len(flags))
+    # Last row before the current run: a False row, or the row before the group
+    resets = np.where(flags, -1, positions)
+    resets[starts] = np.maximum(resets[starts], starts - 1)
+    return np.where(flags, positions - np.maximum.accumulate(resets), 0)
+
+class ShortfallReport:
+    """Supply shortfall alerts for every scheme, computed in one vectorized pass.
+
+    A day is a shortfall when less than ``ratio`` of the expected water was
+    supplied. Per scheme the report holds the overall supplied/expected
+    ratio, the number of shortfall days, the longest and the current
+    (ending on the latest day) shortfall streaks and the longest run of days
+    without any supply. ``severity`` ranks schemes for triage: the missing
+    share of expected water in percent, plus points per day of the current
+    shortfall streak and of the longest zero-supply streak.
+    """
+
+    def __init__(self, water_supply_df, ratio=SHORTFALL_RATIO):
+        start = time.perf_counter()
+        self.ratio = ratio
+        self.schemes = self._detect(water_supply_df)
+        self.alerts = self.schemes[self.schemes['Shortfall Days'] > 0].sort_values(
+            'Severity', ascending=False, kind='stable'
+        ).reset_index(drop=True)
+        self.compute_seconds = time.perf_counter() - start
+
+    def _detect(self, ws_df):
+        columns = [
+            'Scheme Name', 'Days', 'Supplied %', 'Shortfall Days', 'Longest Shortfall',
+            'Current Shortfall', 'Longest Zero Supply', 'Severity'
+        ]
+        if ws_df.empty or not {'Scheme Name', DATE_COL, EXPECTED_COL, SUPPLIED_COL} <= set(ws_df.columns):
+            return pd.DataFrame(columns=columns)
+
+        names = ws_df['Scheme Name']
+        if isinstance(names.dtype, pd.CategoricalDtype):
+            codes, labels = names.array.codes, names.cat.categories
+        else:
+            codes, labels = pd.factorize(names)
+
+        # Chronological order within each scheme; rows without a scheme are left out
+        named = np.flatnonzero(codes >= 0)
+        if len(named) == 0:
+            return pd.DataFrame(columns=columns)
+        order = named[np.lexsort((ws_df[DATE_COL].to_numpy()[named], codes[named]))]
+        codes = codes[order]
+        expected = ws_df[EXPECTED_COL].to_numpy(dtype='float64')[order]
+        supplied = ws_df[SUPPLIED_COL].to_numpy(dtype='float64')[order]
+
+        starts = np.concatenate(([0], np.flatnonzero(codes[1:] != codes[:-1]) + 1))
+        ends = np.append(starts[1:], len(codes)) - 1
+
+        shortfall = supplied < self.ratio * expected
+        shortfall_streaks = _streaks(shortfall, starts)
+        zero_streaks = _streaks(supplied <= 0, starts)
+
+        total_expected = np.add.reduceat(expected, starts)
+        total_supplied = np.add.reduceat(supplied, starts)
+        supplied_pct = np.divide(
+            100 * total_supplied, total_expected,
+            out=np.full(len(starts), 100.0), where=total_expected > 0
+        )
+        current_streak = shortfall_streaks[ends]
+        longest_zero = np.maximum.reduceat(zero_streaks, starts)
+        severity = (
+            np.clip(100 - supplied_pct, 0, None) +
+            SHORTFALL_STREAK_WEIGHT * current_streak +
+            ZERO_SUPPLY_STREAK_WEIGHT * longest_zero
+        )
+
+        return pd.DataFrame({
+            'Scheme Name': labels[codes[starts]],
+            'Days': ends - starts + 1,
+            'Supplied %': supplied_pct.round(1),
+            'Shortfall Days': np.add.reduceat(shortfall.astype(np.int32), starts),
+            'Longest Shortfall': np.maximum.reduceat(shortfall_streaks, starts),
+            'Current Shortfall': current_streak,
+            'Longest Zero Supply': longest_zero,
+            'Severity': severity.round(1)
+        }, columns=columns)
@@ -4,25 +4,26 @@ import streamlit as st
 from datetime import datetime
 
 # Import our modular components
-from constants import TRANSLATIONS, PAGE_CONFIG, SUGGESTION_THRESHOLDS
-from styles import (
-    get_main_css, get_metrics_grid_css, get_satisfaction_grid_css,
-    get_mobile_layout_css, get_toggle_switch_css, get_container_css
+from constants import (
+    TRANSLATIONS, PAGE_CONFIG, SUGGESTION_THRESHOLDS, EXCEL_PATH, LANGUAGES, PRERENDER_FRAGMENTS,
+    LEADERBOARD_METRICS, LEADERBOARD_SIZE, COMPARE_MAX_SCHEMES, MOBILE_DELTA_BUDGET, MOBILE_BYTES_BUDGET
 )
+from styles import get_css_bundle
 from data_processor import DataProcessor
+from data_watcher import watch_period_store
+from dataset_cache import DATASET_CACHE
+from period_store import get_period_store
 from chart_builder import ChartBuilder
+from suggestions import SUGGESTION_ENGINE
+from timing import PayloadMeter, metered, timed
 
 def initialize_app():
     """Initialize the Streamlit app with configuration and styling"""
     st.set_page_config(**PAGE_CONFIG)
     
-    # Apply all CSS styling
-    st.markdown(get_main_css(), unsafe_allow_html=True)
-    st.markdown(get_metrics_grid_css(), unsafe_allow_html=True)
-    st.markdown(get_satisfaction_grid_css(), unsafe_allow_html=True)
-    st.markdown(get_mobile_layout_css(), unsafe_allow_html=True)
-    st.markdown(get_toggle_switch_css(), unsafe_allow_html=True)
-    st.markdown(get_container_css(), unsafe_allow_html=True)
+    # All CSS in one pre-built block. It is only re-sent on full page runs
+    # (language/period changes); fragment reruns leave it in place.
+    st.markdown(get_css_bundle(), unsafe_allow_html=True)
 
 def setup_language_toggle():
     """Setup language toggle functionality"""
@@ -50,17 +51,28 @@ def setup_language_toggle():
             )
     
     # Get current language code and translations
-    lang_code = 'as' if st.session_state.language == 'Assamese' else 'en'
+    lang_code = LANGUAGES[st.session_state.language]
     return TRANSLATIONS[lang_code]
 
-def render_header(translations):
+def render_period_selector(store, translations):
+    """Render the reporting period picker and return the selected period"""
+    periods = store.periods()
+    if len(periods) <= 1:
+        return periods[0] if periods else None
+    
+    col1, col2 = st.columns([6, 2])
+    with col2:
+        return st.selectbox(translations['period'], options=periods, key='period_selectbox')
+
+@timed('header')
+def render_header(data_processor, translations):
     """Render the header section"""
     st.markdown(
         f"""
         <div class="header-container" style="margin-bottom: 0; margin-top: 0;">
             <div style="flex: 1;"></div>
             <div style="text-align: right;">
-                <p style="color: #666; margin: 0;">{translations['report_date']}</p>
+                <p style="color: #666; margin: 0;">{data_processor.format_report_date(translations)}</p>
             </div>
         </div>
         """,
@@ -77,52 +89,44 @@ def render_filters(data_processor, translations):
     """Render the filter section"""
     filter_col1, filter_col2, filter_col3, filter_col4 = st.columns([1, 1, 1, 1], gap="large")
     
-    # Get filter options
-    options = data_processor.get_filter_options()
+    # All options come from the hierarchy index built at load time
+    hierarchy = data_processor.dataset.hierarchy
     
     with filter_col1:
         st.markdown(f'<div class="filter-label">{translations["district"]}</div>', unsafe_allow_html=True)
         selected_district = st.selectbox(
             '',
-            options=options['districts'],
+            options=hierarchy.districts(),
             key='district_selectbox',
             label_visibility='collapsed'
         )
     
-    # Update options based on selected district
-    options = data_processor.get_filter_options(selected_district)
-    
     with filter_col2:
         st.markdown(f'<div class="filter-label">{translations["division"]}</div>', unsafe_allow_html=True)
         selected_division = st.selectbox(
             '',
-            options=options['divisions'],
+            options=hierarchy.divisions(selected_district),
             key='division_selectbox',
             label_visibility='collapsed'
         )
     
-    # Update options based on selected division
-    options = data_processor.get_filter_options(selected_district, selected_division)
-    
     with filter_col3:
         st.markdown(f'<div class="filter-label">{translations["sub_division"]}</div>', unsafe_allow_html=True)
         selected_sub_div = st.selectbox(
             '',
-            options=options['sub_divisions'],
+            options=hierarchy.sub_divisions(selected_district, selected_division),
             key='sub_division_selectbox',
             label_visibility='collapsed'
         )
     
-    # Update options based on selected sub-division
-    options = data_processor.get_filter_options(selected_district, selected_division, selected_sub_div)
+    schemes = hierarchy.schemes(selected_district, selected_division, selected_sub_div)
     
     # Reset scheme selection if filters change
-    if "last_district" not in st.session_state or st.session_state.last_district != selected_district:
-        st.session_state["scheme_selectbox"] = options['schemes'][0] if options['schemes'] else None
-    if "last_division" not in st.session_state or st.session_state.last_division != selected_division:
-        st.session_state["scheme_selectbox"] = options['schemes'][0] if options['schemes'] else None
-    if "last_sub_div" not in st.session_state or st.session_state.last_sub_div != selected_sub_div:
-        st.session_state["scheme_selectbox"] = options['schemes'][0] if options['schemes'] else None
+    if ("last_sub_div" not in st.session_state or
+            st.session_state.get("last_district") != selected_district or
+            st.session_state.get("last_division") != selected_division or
+            st.session_state.get("last_sub_div") != selected_sub_div):
+        st.session_state["scheme_selectbox"] = schemes[0] if schemes else None
     
     st.session_state["last_district"] = selected_district
     st.session_state["last_division"] = selected_division
@@ -132,87 +136,26 @@ def render_filters(data_processor, translations):
         st.markdown(f'<div class="filter-label">{translations["select_village"]}</div>', unsafe_allow_html=True)
         selected_scheme = st.selectbox(
             '',
-            options=options['schemes'],
+            options=schemes,
             key="scheme_selectbox",
             label_visibility="collapsed"
         )
     
     return selected_district, selected_division, selected_sub_div, selected_scheme
 
+def report_cache_key(data_processor, current_row):
+    """Cache key of the rendered report for the current scheme, language and data"""
+    scheme_key = (current_row['District'], current_row['Division'], current_row['Sub Division'], current_row['Scheme Name'])
+    return scheme_key, st.session_state['language'], data_processor.dataset.version
+
+@timed('mobile_layout')
 def render_mobile_layout(data_processor, chart_builder, selected_scheme, current_row, translations):
-    """Render mobile layout"""
-    # Mobile header bar
-    st.markdown(f'''
-    <div class="mobile-header-bar">
-        <span>{translations['report_date']}</span>
-        <span style="color:#2d63c7;font-weight:bold;">{translations['title']}</span>
-    </div>
-    ''', unsafe_allow_html=True)
-    
-    # Scheme title and sub-division
-    st.markdown(f'<div class="mobile-scheme-title">{selected_scheme}</div>', unsafe_allow_html=True)
-    st.markdown(f'<div class="mobile-subdivision">[{current_row["Sub Division"]}]</div>', unsafe_allow_html=True)
-    
-    # Performance summary
-    st.markdown(f'''
-    <div class="mobile-summary-row">
-        <span class="mobile-summary-icon">📊</span>
-        <span class="mobile-summary-text">
-            <span class="mobile-summary-title">{translations['performance_summary']}</span>
-            <span class="mobile-summary-desc">{translations['performance_description']}</span>
-        </span>
-    </div>
-    ''', unsafe_allow_html=True)
-    
-    # Format metrics and satisfaction for mobile
-    metrics = data_processor.format_metrics(current_row, translations)
-    satisfaction = data_processor.format_satisfaction(current_row, translations)
-    
-    # Mobile metrics grid
-    st.markdown('<div class="mobile-metrics-grid">', unsafe_allow_html=True)
-    for metric_key, metric_data in metrics.items():
-        st.markdown(
-            f'''<div class="mobile-metric-card">
-                <div class="mobile-metric-icon">{metric_data['icon']}</div>
-                <div class="mobile-metric-label">{metric_data['label']}</div>
-                <div class="mobile-metric-value">{metric_data['value']}%</div>
-            </div>''', 
-            unsafe_allow_html=True
-        )
-    st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Mobile satisfaction
-    satisfaction_html = f'''<div class="mobile-satisfaction-card">
-        <div class="mobile-satisfaction-title">{translations['overall_satisfaction']}</div>
-        <div class="mobile-satisfaction-row">'''
-    
-    for satisfaction_key, satisfaction_data in satisfaction.items():
-        satisfaction_html += f'''<div class="mobile-satisfaction-box mobile-{satisfaction_data['class']}">
-            <div class="mobile-satisfaction-emoji">{satisfaction_data['emoji']}</div>
-            <div class="mobile-satisfaction-label">{satisfaction_data['label']}</div>
-            <div class="mobile-satisfaction-value">{satisfaction_data['value']}%</div>
-        </div>'''
-    
-    satisfaction_html += '</div></div>'
-    st.markdown(satisfaction_html, unsafe_allow_html=True)
+    """Render mobile layout as one pre-built HTML payload per scheme and language"""
+    page = chart_builder.get_report_fragments(
+        report_cache_key(data_processor, current_row), 'mobile', data_processor, current_row, translations
+    )['page']
     
-    # Mobile next steps
-    current_suggestions = data_processor.get_suggestions(current_row, translations, SUGGESTION_THRESHOLDS)
-    suggestions_html = f'''<div class="mobile-next-steps-card">
-        <div class="mobile-next-steps-title">Suggested next steps</div>
-        <ul style="margin:0 0 0 1rem;padding:0;">'''
-    
-    for suggestion in current_suggestions:
-        suggestions_html += f'<li>{suggestion}</li>'
-    
-    suggestions_html += '</ul></div>'
-    st.markdown(suggestions_html, unsafe_allow_html=True)
-    
-    # Mobile footer
-    st.markdown(f'<div class="mobile-footer">{translations["footer"]}</div>', unsafe_allow_html=True)
-    
-    # Hide chart and table in mobile
-    st.markdown('<style>.stPlotlyChart, .stDataFrame {display:none !important;}</style>', unsafe_allow_html=True)
+    st.markdown(page, unsafe_allow_html=True)
 
 def render_desktop_layout(data_processor, chart_builder, selected_scheme, current_row, translations):
     """Render desktop layout"""
@@ -232,30 +175,24 @@ def render_desktop_layout(data_processor, chart_builder, selected_scheme, curren
         unsafe_allow_html=True
     )
     
-    # Format metrics and satisfaction
-    metrics = data_processor.format_metrics(current_row, translations)
-    satisfaction = data_processor.format_satisfaction(current_row, translations)
+    # Metrics and satisfaction HTML, rendered once per scheme/language/data version
+    fragments = chart_builder.get_report_fragments(
+        report_cache_key(data_processor, current_row), 'desktop', data_processor, current_row, translations
+    )
     
     # Key Metrics Section
-    metrics_html = chart_builder.create_metrics_grid_html(metrics, translations)
-    st.markdown(metrics_html, unsafe_allow_html=True)
+    st.markdown(fragments['metrics'], unsafe_allow_html=True)
+    render_reliability_cards(data_processor, chart_builder, selected_scheme, translations)
     
     # Overall Satisfaction Section
     st.markdown(f"<h3 style='color: #1a237e; margin-top: 0.2rem; margin-bottom: 1.5rem;'>{translations['overall_satisfaction']}</h3>", unsafe_allow_html=True)
-    satisfaction_html = chart_builder.create_satisfaction_grid_html(satisfaction, translations)
-    st.markdown(satisfaction_html, unsafe_allow_html=True)
+    st.markdown(fragments['satisfaction'], unsafe_allow_html=True)
     
     # Add spacing before chart
     st.markdown("<div style='margin-top: 2rem;'></div>", unsafe_allow_html=True)
     
     # Water Supply Chart
-    ws_village = data_processor.get_water_supply_data(selected_scheme)
-    if ws_village is not None:
-        fig = chart_builder.create_water_supply_chart(ws_village, translations)
-        st.markdown(f"<h4 style='color: #1a237e; margin-top: 2rem; margin-bottom: 1rem;'>{translations['water_supply_chart']}</h4>", unsafe_allow_html=True)
-        st.markdown('<div style="overflow-x:auto; width:100%;">', unsafe_allow_html=True)
-        st.plotly_chart(fig)
-        st.markdown('</div>', unsafe_allow_html=True)
+    render_water_supply_chart(data_processor.excel_path, chart_builder, selected_scheme, translations)
     
     # Suggested Next Steps
     current_suggestions = data_processor.get_suggestions(current_row, translations, SUGGESTION_THRESHOLDS)
@@ -273,34 +210,320 @@ def render_desktop_layout(data_processor, chart_builder, selected_scheme, curren
         unsafe_allow_html=True
     )
     
+    # Panels about the area around the selected scheme. They are fragments:
+    # they get the workbook path, not the data processor, so a rerun of one
+    # panel alone picks up reloaded data
+    render_rollup_panel(data_processor.excel_path, chart_builder, current_row, translations)
+    render_attention_list(data_processor.excel_path, current_row, translations)
+    render_supply_alerts(data_processor.excel_path, current_row, translations)
+    render_what_if_panel(data_processor.excel_path, translations)
+    render_leaderboard(data_processor.excel_path, current_row, translations)
+    render_comparison_view(data_processor.excel_path, chart_builder, current_row, translations)
+    
     # Footer
     st.markdown("---")
-    st.markdown(f"<p style='text-align: right; color: #666;'>{translations['footer']}</p>", unsafe_allow_html=True)
+    st.markdown(f"<p style='text-align: right; color: #666;'>{data_processor.format_footer(translations)}</p>", unsafe_allow_html=True)
+    render_data_version(data_processor, translations)
+
+@st.fragment
+@timed('chart')
+def render_water_supply_chart(excel_path, chart_builder, selected_scheme, translations):
+    """Render the water supply chart; changing its date range reruns only this fragment"""
+    data_processor = DataProcessor(excel_path=excel_path)
+    start, end = render_date_range_picker(data_processor, selected_scheme, translations)
+    ws_village = data_processor.get_water_supply_data(selected_scheme, start, end)
+    if ws_village is None:
+        return
+    
+    cache_key = (selected_scheme, st.session_state['language'], data_processor.dataset.version, start, end)
+    fig = chart_builder.get_water_supply_chart(cache_key, ws_village, translations)
+    st.markdown(f"<h4 style='color: #1a237e; margin-top: 2rem; margin-bottom: 1rem;'>{translations['water_supply_chart']}</h4>", unsafe_allow_html=True)
+    st.markdown('<div style="overflow-x:auto; width:100%;">', unsafe_allow_html=True)
+    st.plotly_chart(fig)
+    st.markdown('</div>', unsafe_allow_html=True)
+    render_chart_size(chart_builder, fig, cache_key, translations)
+
+def render_reliability_cards(data_processor, chart_builder, selected_scheme, translations):
+    """Render supply fulfilment of the selected scheme over the rolling windows"""
+    reliability = data_processor.get_supply_reliability(selected_scheme)
+    if not reliability:
+        return
+    
+    st.markdown(f"<h4 style='color: #1a237e; margin-top: 0.5rem; margin-bottom: 1rem;'>{translations['reliability']}</h4>", unsafe_allow_html=True)
+    st.markdown(chart_builder.create_reliability_grid_html(reliability, translations), unsafe_allow_html=True)
+
+def render_chart_size(chart_builder, fig, cache_key, translations):
+    """Show how many points and bytes the water supply chart sends to the browser"""
+    chart_bytes = chart_builder.chart_bytes('water_supply', cache_key)
+    meta = fig.layout.meta or {}
+    if chart_bytes is None or not meta:
+        return
+    st.caption(translations['chart_size'].format(points=meta['points'], days=meta['days'], kb=chart_bytes / 1024))
+
+def render_date_range_picker(data_processor, selected_scheme, translations):
+    """Render a date range picker when the scheme has more than a week of supply data.
+    
+    Returns the selected (start, end) dates, or (None, None) for all dates.
+    """
+    date_range = data_processor.get_supply_date_range(selected_scheme)
+    if date_range is None or (date_range[1] - date_range[0]).days < 7:
+        return None, None
+    
+    selected = st.date_input(
+        translations['date_range'],
+        value=date_range,
+        min_value=date_range[0],
+        max_value=date_range[1],
+        key=f'date_range_{selected_scheme}'
+    )
+    # Half-picked ranges (a single date) show everything until completed
+    if not isinstance(selected, (tuple, list)) or len(selected) != 2:
+        return None, None
+    if tuple(selected) == date_range:
+        return None, None
+    
+    return selected[0], selected[1]
+
+@st.fragment
+@timed('area_summary')
+def render_rollup_panel(excel_path, chart_builder, current_row, translations):
+    """Render the aggregate metrics of the district, division or sub-division of the selected scheme"""
+    data_processor = DataProcessor(excel_path=excel_path)
+    with st.expander(translations['area_summary']):
+        path = (current_row['District'], current_row['Division'], current_row['Sub Division'])
+        depth = st.radio(
+            translations['area_level'],
+            options=[1, 2, 3],
+            index=2,
+            format_func=lambda level: path[level - 1],
+            horizontal=True,
+            key='area_level'
+        )
+        
+        rollup = data_processor.get_rollup(path[:depth])
+        if rollup is None:
+            return
+        
+        st.caption(translations['area_schemes'].format(count=rollup['schemes']))
+        metrics = data_processor.format_metrics(rollup, translations)
+        st.markdown(chart_builder.create_metrics_grid_html(metrics, translations), unsafe_allow_html=True)
+        satisfaction = data_processor.format_satisfaction(rollup, translations)
+        st.markdown(chart_builder.create_satisfaction_grid_html(satisfaction, translations), unsafe_allow_html=True)
+
+@st.fragment
+@timed('attention_list')
+def render_attention_list(excel_path, current_row, translations):
+    """Render the schemes that trip a suggestion rule within the selected hierarchy node"""
+    data_processor = DataProcessor(excel_path=excel_path)
+    with st.expander(translations['attention_needed']):
+        path = (current_row['District'], current_row['Division'], current_row['Sub Division'])
+        depth = st.radio(
+            translations['attention_level'],
+            options=[1, 2, 3],
+            index=2,
+            format_func=lambda level: path[level - 1],
+            horizontal=True,
+            key='attention_level'
+        )
+        
+        attention = data_processor.get_attention_list(path[:depth])
+        if attention.empty:
+            st.info(translations['attention_none'])
+            return
+        
+        rule_labels = {rule: translations[f'rule_{rule}'] for rule in SUGGESTION_ENGINE.rules}
+        issues = [
+            ', '.join(rule_labels[rule] for rule in SUGGESTION_ENGINE.rules_for(mask))
+            for mask in attention['Rules'].tolist()
+        ]
+        st.dataframe(
+            {
+                translations['select_village']: attention['Scheme Name'].tolist(),
+                translations['sub_division']: attention['Sub Division'].tolist(),
+                translations['issues']: issues
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+
+@st.fragment
+@timed('supply_alerts')
+def render_supply_alerts(excel_path, current_row, translations):
+    """Render schemes with supply shortfalls, most severe first"""
+    data_processor = DataProcessor(excel_path=excel_path)
+    with st.expander(translations['supply_alerts']):
+        path = (current_row['District'], current_row['Division'], current_row['Sub Division'])
+        depth = st.radio(
+            translations['supply_alerts_level'],
+            options=[1, 2, 3],
+            index=1,
+            format_func=lambda level: path[level - 1],
+            horizontal=True,
+            key='supply_alerts_level'
+        )
+        
+        shortfalls = data_processor.dataset.shortfalls
+        st.caption(translations['supply_alerts_timing'].format(
+            schemes=len(shortfalls.schemes), ms=shortfalls.compute_seconds * 1000
+        ))
+        
+        alerts = data_processor.get_supply_alerts(path[:depth])
+        if alerts.empty:
+            st.info(translations['supply_alerts_none'])
+            return
+        
+        st.dataframe(alerts.drop(columns=['District', 'Division']), hide_index=True, use_container_width=True)
+
+@st.fragment
+@timed('what_if')
+def render_what_if_panel(excel_path, translations):
+    """Render threshold sliders with the number of schemes each rule would flag"""
+    data_processor = DataProcessor(excel_path=excel_path)
+    with st.expander(translations['what_if']):
+        rules = list(SUGGESTION_ENGINE.rules)
+        thresholds = {}
+        for column, rule in zip(st.columns(len(rules)), rules):
+            with column:
+                thresholds[rule] = st.slider(
+                    translations[f'rule_{rule}'],
+                    min_value=0,
+                    max_value=100,
+                    value=SUGGESTION_THRESHOLDS[rule],
+                    format='%d%%',
+                    key=f'what_if_{rule}'
+                )
+        
+        depth = st.radio(
+            translations['what_if_level'],
+            options=[1, 2],
+            format_func=lambda level: translations['district'] if level == 1 else translations['division'],
+            horizontal=True,
+            key='what_if_level'
+        )
+        
+        counts = data_processor.get_flagged_counts(depth, thresholds)
+        table = {
+            (translations['district'] if depth == 1 else translations['division']): [' / '.join(row['path']) for row in counts],
+            translations['schemes']: [row['schemes'] for row in counts]
+        }
+        for rule in rules:
+            table[translations[f'rule_{rule}']] = [row[rule] for row in counts]
+        st.dataframe(table, hide_index=True, use_container_width=True)
+
+@st.fragment
+@timed('leaderboard')
+def render_leaderboard(excel_path, current_row, translations):
+    """Render the best or worst schemes by a metric within the selected district or division"""
+    data_processor = DataProcessor(excel_path=excel_path)
+    with st.expander(translations['leaderboard']):
+        col1, col2 = st.columns(2)
+        with col1:
+            column = st.selectbox(
+                translations['leaderboard_metric'],
+                options=list(LEADERBOARD_METRICS),
+                format_func=lambda col: translations[LEADERBOARD_METRICS[col][0]],
+                key='leaderboard_metric'
+            )
+            best = st.radio(
+                translations['leaderboard_order'],
+                options=[True, False],
+                format_func=lambda value: translations['leaderboard_best'] if value else translations['leaderboard_worst'],
+                horizontal=True,
+                key='leaderboard_order'
+            )
+        with col2:
+            path = (current_row['District'], current_row['Division'])
+            depth = st.radio(
+                translations['leaderboard_level'],
+                options=[1, 2],
+                index=1,
+                format_func=lambda level: path[level - 1],
+                horizontal=True,
+                key='leaderboard_level'
+            )
+            k = st.slider(translations['leaderboard_size'], min_value=5, max_value=50, value=LEADERBOARD_SIZE, key='leaderboard_size')
+        
+        leaders = data_processor.get_leaderboard(path[:depth], column, k, best)
+        st.dataframe(
+            {
+                translations['rank']: list(range(1, len(leaders) + 1)),
+                translations['select_village']: leaders['Scheme Name'].tolist(),
+                translations['sub_division']: leaders['Sub Division'].tolist(),
+                translations[LEADERBOARD_METRICS[column][0]]: [f'{value}%' for value in leaders[column].tolist()]
+            },
+            hide_index=True,
+            use_container_width=True
+        )
 
+@st.fragment
+@timed('compare')
+def render_comparison_view(excel_path, chart_builder, current_row, translations):
+    """Render metrics and water supply of several schemes of the selected division side by side"""
+    data_processor = DataProcessor(excel_path=excel_path)
+    with st.expander(translations['compare']):
+        district, division = current_row['District'], current_row['Division']
+        options = [
+            (district, division, sub_div, scheme)
+            for sub_div in data_processor.dataset.hierarchy.sub_divisions(district, division)
+            for scheme in data_processor.dataset.hierarchy.schemes(district, division, sub_div)
+        ]
+        current_key = (district, division, current_row['Sub Division'], current_row['Scheme Name'])
+        selected = st.multiselect(
+            translations['compare_select'].format(count=COMPARE_MAX_SCHEMES),
+            options=options,
+            default=[current_key] if current_key in options else [],
+            format_func=lambda key: f"{key[3]}, {key[2]}",
+            max_selections=COMPARE_MAX_SCHEMES,
+            key=f'compare_{district}_{division}'
+        )
+        if not selected:
+            return
+        
+        rows, ws_schemes = data_processor.get_comparison_data(selected)
+        
+        # Metric and satisfaction values side by side, one column per scheme
+        table = {translations['metric']: [translations[key] for key, _ in LEADERBOARD_METRICS.values()]}
+        for _, row in rows.iterrows():
+            table[f"{row['Scheme Name']}, {row['Sub Division']}"] = [f"{int(row[col])}%" for col in LEADERBOARD_METRICS]
+        st.dataframe(table, hide_index=True, use_container_width=True)
+        
+        if not ws_schemes.empty:
+            cache_key = (tuple(rows['Scheme Name'].tolist()), st.session_state['language'], data_processor.dataset.version)
+            st.plotly_chart(chart_builder.get_comparison_chart(cache_key, ws_schemes, translations))
+
+def render_data_version(data_processor, translations):
+    """Render the version and load time of the data being shown"""
+    dataset = data_processor.dataset
+    st.caption(translations['data_version'].format(version=dataset.version, seconds=dataset.load_seconds))
+
+@timed('page')
+@metered('page')
 def main():
     """Main application function"""
     # Initialize app
     initialize_app()
     
-    # Initialize components
-    data_processor = DataProcessor()
+    # Every period's workbook is ingested once per process and reloaded
+    # in the background when it changes
+    store = get_period_store(DATASET_CACHE)
+    watch_period_store(store)
     chart_builder = ChartBuilder()
     
     # Setup language toggle and get translations
     translations = setup_language_toggle()
     
-    # Render header
-    render_header(translations)
-    
-    # Render filters and get selections
-    selected_district, selected_division, selected_sub_div, selected_scheme = render_filters(data_processor, translations)
+    # Pick the reporting period and load its partition
+    selected_period = render_period_selector(store, translations)
+    excel_path = store.path_for(selected_period) or EXCEL_PATH
+    data_processor = DataProcessor(excel_path=excel_path)
     
-    # Get current row data
-    current_row = data_processor.get_filtered_data(selected_district, selected_division, selected_sub_div, selected_scheme)
+    # Render header
+    render_header(data_processor, translations)
     
-    if current_row is None:
-        st.error("No data found for the selected filters.")
-        return
+    if PRERENDER_FRAGMENTS:
+        chart_builder.prerender_in_background(
+            data_processor, {language: TRANSLATIONS[code] for language, code in LANGUAGES.items()}
+        )
     
     # Mobile detection logic
     if 'force_mobile' not in st.session_state:
@@ -310,11 +533,45 @@ def main():
         except Exception:
             st.session_state['force_mobile'] = False
     
-    # Render appropriate layout
-    if st.session_state.get('force_mobile', False):
-        render_mobile_layout(data_processor, chart_builder, selected_scheme, current_row, translations)
-    else:
-        render_desktop_layout(data_processor, chart_builder, selected_scheme, current_row, translations)
+    # Filters and the report body rerun on their own when a filter changes
+    render_report(excel_path, chart_builder, translations)
+
+@st.fragment
+@timed('report')
+def render_report(excel_path, chart_builder, translations):
+    """Render the filter bar and the report of the selected scheme.
+    
+    This is a fragment, so changing a filter reruns only the report, not the
+    page header, CSS or language toggle. Panels with their own inputs are
+    nested fragments that rerun alone.
+    
+    A fragment rerun reuses the arguments of the last full run, so it takes
+    the workbook path and fetches the current dataset from the cache itself.
+    """
+    data_processor = DataProcessor(excel_path=excel_path)
+    mobile = st.session_state.get('force_mobile', False)
+    
+    # Everything this run sends (filters, warnings, report) counts against
+    # the mobile budget
+    with PayloadMeter('mobile_report' if mobile else 'desktop_report', *((MOBILE_DELTA_BUDGET, MOBILE_BYTES_BUDGET) if mobile else ())):
+        # Render filters and get selections
+        selected_district, selected_division, selected_sub_div, selected_scheme = render_filters(data_processor, translations)
+        
+        # Get current row data
+        current_row = data_processor.get_filtered_data(selected_district, selected_division, selected_sub_div, selected_scheme)
+        
+        if current_row is None:
+            st.error("No data found for the selected filters.")
+            return
+        
+        if data_processor.has_conflicting_rows(selected_district, selected_division, selected_sub_div, selected_scheme):
+            st.warning("This scheme has conflicting duplicate rows in the report; showing the first one.")
+        
+        # Render appropriate layout
+        if mobile:
+            render_mobile_layout(data_processor, chart_builder, selected_scheme, current_row, translations)
+        else:
+            render_desktop_layout(data_processor, chart_builder, selected_scheme, current_row, translations)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
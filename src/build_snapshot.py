@@ -0,0 +1,28 @@
+# Convert the report workbook into a memory-mappable columnar snapshot
+#
+# Usage: python src/build_snapshot.py [--excel PATH] [--out DIR]
+
+import argparse
+import time
+
+from constants import EXCEL_PATH, SNAPSHOT_DIR
+from dataset import build_snapshot, load_dataset
+
+def main():
+    """Build the snapshot and check that it loads back"""
+    parser = argparse.ArgumentParser(description='Convert the report workbook into a columnar snapshot.')
+    parser.add_argument('--excel', default=EXCEL_PATH, help='workbook to convert (default: %(default)s)')
+    parser.add_argument('--out', default=SNAPSHOT_DIR, help='snapshot root directory (default: %(default)s)')
+    args = parser.parse_args()
+
+    directory, dataset = build_snapshot(args.excel, args.out)
+    print(f"Parsed {args.excel} in {dataset.load_seconds:.2f}s")
+    print(f"Wrote snapshot {directory} (version {dataset.version})")
+
+    started = time.perf_counter()
+    mapped = load_dataset(args.excel, snapshot_root=args.out)
+    print(f"Snapshot loads in {(time.perf_counter() - started) * 1000:.1f}ms "
+          f"({len(mapped.df)} schemes, {len(mapped.water_supply_df)} supply rows)")
+
+if __name__ == "__main__":
+    main()
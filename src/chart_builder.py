@@ -1,17 +1,86 @@
 # Chart building components for the Water Supply Dashboard
 
-import plotly.graph_objects as go
-from constants import CHART_COLORS, CHART_STYLING
+import threading
+
+import numpy as np
+from constants import (
+    CHART_COLORS, CHART_STYLING, COMPARE_COLORS, FIGURE_CACHE_MAX_ENTRIES, FIGURE_CACHE_MAX_BYTES,
+    FRAGMENT_CACHE_MAX_ENTRIES, FRAGMENT_CACHE_MAX_BYTES, CHART_LABEL_MAX_POINTS, CHART_POINT_BUDGET,
+    SUGGESTION_THRESHOLDS, SPARKLINE_STYLING
+)
+from lru_cache import LRUCache
+
+# Built figures and HTML are shared by every session; they must not be mutated
+FIGURE_CACHE = LRUCache(FIGURE_CACHE_MAX_ENTRIES, FIGURE_CACHE_MAX_BYTES)
+FRAGMENT_CACHE = LRUCache(FRAGMENT_CACHE_MAX_ENTRIES, FRAGMENT_CACHE_MAX_BYTES)
+
+# Data version of each workbook whose fragments have been (or are being)
+# pre-rendered
+_prerendered_versions = {}
+_prerender_lock = threading.Lock()
+
+def lttb_indices(y, budget):
+    """Pick ``budget`` indices of ``y`` that keep its visual shape (largest triangle three buckets).
+
+    The first and last points are always kept; from every bucket in between
+    the point forming the largest triangle with the previously kept point
+    and the next bucket's average is chosen, so dips such as days without
+    supply survive the downsampling.
+    """
+    n = len(y)
+    if budget >= n or budget < 3:
+        return np.arange(n)
+    y = np.asarray(y, dtype='float64')
+    x = np.arange(n, dtype='float64')
+    edges = np.linspace(1, n - 1, budget - 1).astype(int)
+    indices = np.empty(budget, dtype=np.intp)
+    indices[0], indices[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(budget - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[stop:next_stop].mean()
+        next_y = y[stop:next_stop].mean()
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous]) -
+            (x[previous] - x[start:stop]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        indices[bucket + 1] = previous
+    return indices
+
+def _figure_size(fig):
+    return len(fig.to_json())
 
 class ChartBuilder:
     """Handles all chart creation and styling operations"""
     
-    def __init__(self):
+    def __init__(self, figure_cache=FIGURE_CACHE, fragment_cache=FRAGMENT_CACHE):
         self.colors = CHART_COLORS
         self.styling = CHART_STYLING
+        self.figure_cache = figure_cache
+        self.fragment_cache = fragment_cache
+    
+    def get_water_supply_chart(self, cache_key, ws_village, translations):
+        """Return the water supply chart for ``cache_key`` = (scheme, language, data version)"""
+        return self.figure_cache.get_or_create(
+            ('water_supply',) + tuple(cache_key),
+            lambda: self.create_water_supply_chart(ws_village, translations),
+            sizeof=_figure_size
+        )
+    
+    def chart_bytes(self, kind, cache_key):
+        """Return the serialized size of a cached chart, e.g. kind 'water_supply'"""
+        return self.figure_cache.size((kind,) + tuple(cache_key))
     
     def create_water_supply_chart(self, ws_village, translations):
         """Create the water supply comparison chart"""
+        if len(ws_village) > CHART_LABEL_MAX_POINTS:
+            return self.create_long_water_supply_chart(ws_village, translations)
+        
+        # Imported on first use, so processes that never build a figure skip plotly
+        import plotly.graph_objects as go
+        
         fig = go.Figure()
         
         # Bar for expected supply (show value on top of bar)
@@ -84,6 +153,119 @@ class ChartBuilder:
             height=self.styling['chart_height'],
             yaxis=dict(range=[0, yaxis_max])
         )
+        fig.layout.meta = {'points': len(ws_village), 'days': len(ws_village)}
+        
+        return fig
+    
+    def _downsampled(self, ws_village, budget=CHART_POINT_BUDGET):
+        """Return (dates, expected, supplied) cut to the point budget, shaped by the supply line"""
+        supplied = ws_village['Water Supplied (in kl)'].to_numpy()
+        indices = lttb_indices(supplied, budget)
+        return (
+            ws_village['Date (Prev 7 days)'].to_numpy()[indices],
+            ws_village['Expected water delivery'].to_numpy()[indices],
+            supplied[indices]
+        )
+    
+    def create_long_water_supply_chart(self, ws_village, translations):
+        """Create the water supply chart for long histories: downsampled WebGL lines, no point labels"""
+        import plotly.graph_objects as go
+        
+        dates, expected, supplied = self._downsampled(ws_village)
+        fig = go.Figure()
+        
+        fig.add_trace(go.Scattergl(
+            x=dates,
+            y=expected,
+            mode='lines',
+            name=translations['expected_water'],
+            line=dict(color=self.colors['bar_color'], width=2),
+            fill='tozeroy',
+            hovertemplate=f"{translations['expected_water']}: %{{y}}<extra></extra>"
+        ))
+        fig.add_trace(go.Scattergl(
+            x=dates,
+            y=supplied,
+            mode='lines+markers',
+            name=translations['supplied_water'],
+            line=dict(color=self.colors['line_color']),
+            marker=dict(size=4, color=self.colors['line_color']),
+            hovertemplate=f"{translations['supplied_water']}: %{{y:.2f}}<extra></extra>"
+        ))
+        
+        max_y = max(ws_village['Expected water delivery'].max(), ws_village['Water Supplied (in kl)'].max())
+        yaxis_max = max_y * 1.2 if max_y > 0 else 10
+        
+        fig.update_layout(
+            title=translations['water_supply_chart'],
+            xaxis_title=translations['date'],
+            yaxis_title=translations['volume_kl'],
+            legend_title='',
+            legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='left', x=0),
+            template='simple_white',
+            margin=self.styling['margin'],
+            width=self.styling['chart_width'],
+            height=self.styling['chart_height'],
+            yaxis=dict(range=[0, yaxis_max]),
+            meta={'points': len(dates), 'days': len(ws_village)}
+        )
+        
+        return fig
+    
+    def get_comparison_chart(self, cache_key, ws_schemes, translations):
+        """Return the comparison chart for ``cache_key`` = (schemes, language, data version)"""
+        return self.figure_cache.get_or_create(
+            ('comparison',) + tuple(cache_key),
+            lambda: self.create_comparison_chart(ws_schemes, translations),
+            sizeof=_figure_size
+        )
+    
+    def create_comparison_chart(self, ws_schemes, translations):
+        """Create one chart overlaying expected (dashed) and supplied (solid) water of several schemes"""
+        import plotly.graph_objects as go
+        
+        fig = go.Figure()
+        
+        for i, (scheme, ws_village) in enumerate(ws_schemes.groupby('Scheme Name', observed=True, sort=False)):
+            color = COMPARE_COLORS[i % len(COMPARE_COLORS)]
+            long_history = len(ws_village) > CHART_LABEL_MAX_POINTS
+            scatter = go.Scattergl if long_history else go.Scatter
+            dates, expected, supplied = self._downsampled(ws_village)
+            fig.add_trace(scatter(
+                x=dates,
+                y=expected,
+                mode='lines',
+                name=f"{scheme} · {translations['expected_water']}",
+                legendgroup=scheme,
+                line=dict(color=color, dash='dash'),
+                hovertemplate=f"{scheme} · {translations['expected_water']}: %{{y}}<extra></extra>"
+            ))
+            fig.add_trace(scatter(
+                x=dates,
+                y=supplied,
+                mode='lines+markers',
+                name=f"{scheme} · {translations['supplied_water']}",
+                legendgroup=scheme,
+                line=dict(color=color),
+                marker=dict(size=4 if long_history else self.styling['marker_size'], color=color),
+                hovertemplate=f"{scheme} · {translations['supplied_water']}: %{{y}}<extra></extra>"
+            ))
+        
+        # Shared y-axis range across all schemes
+        max_y = max(ws_schemes['Expected water delivery'].max(), ws_schemes['Water Supplied (in kl)'].max()) if not ws_schemes.empty else 0
+        yaxis_max = max_y * 1.2 if max_y > 0 else 10
+        
+        fig.update_layout(
+            title=translations['water_supply_chart'],
+            xaxis_title=translations['date'],
+            yaxis_title=translations['volume_kl'],
+            legend_title='',
+            template='simple_white',
+            margin=self.styling['margin'],
+            width=self.styling['chart_width'],
+            height=self.styling['chart_height'],
+            yaxis=dict(range=[0, yaxis_max])
+        )
         
         return fig
     
@@ -164,4 +346,214 @@ class ChartBuilder:
             label3=satisfaction['sad']['label'],
             value3=satisfaction['sad']['value'],
             class3=satisfaction['sad']['class']
-        ) 
\ No newline at end of file
+        )
+    
+    def create_reliability_grid_html(self, reliability, translations):
+        """Create HTML for the rolling supply reliability cards"""
+        cards = ''
+        for days, totals in reliability:
+            fulfilment = f"{totals['fulfilment']:.0f}%" if totals['fulfilment'] is not None else '–'
+            cards += f'''
+            <div class="metric-card">
+                <div class="metric-label">{translations['last_days'].format(days=days)}</div>
+                <div class="metric-value">{fulfilment}</div>
+                <div class="metric-label">{translations['fulfilled']}</div>
+                <div class="reliability-detail">{translations['supply_days'].format(supplied=totals['supply_days'], days=totals['days'], kl=totals['supplied'])}</div>
+            </div>'''
+        
+        return f'<div class="reliability-grid">{cards}</div>'
+    
+    def create_mobile_metric_cards_html(self, metrics):
+        """Create one HTML card per metric for the mobile layout"""
+        return [
+            f'''<div class="mobile-metric-card">
+                <div class="mobile-metric-icon">{metric_data['icon']}</div>
+                <div class="mobile-metric-label">{metric_data['label']}</div>
+                <div class="mobile-metric-value">{metric_data['value']}%</div>
+            </div>'''
+            for metric_data in metrics.values()
+        ]
+    
+    def create_mobile_satisfaction_html(self, satisfaction, translations):
+        """Create HTML for the mobile satisfaction card"""
+        satisfaction_html = f'''<div class="mobile-satisfaction-card">
+        <div class="mobile-satisfaction-title">{translations['overall_satisfaction']}</div>
+        <div class="mobile-satisfaction-row">'''
+        
+        for satisfaction_data in satisfaction.values():
+            satisfaction_html += f'''<div class="mobile-satisfaction-box mobile-{satisfaction_data['class']}">
+            <div class="mobile-satisfaction-emoji">{satisfaction_data['emoji']}</div>
+            <div class="mobile-satisfaction-label">{satisfaction_data['label']}</div>
+            <div class="mobile-satisfaction-value">{satisfaction_data['value']}%</div>
+        </div>'''
+        
+        return satisfaction_html + '</div></div>'
+    
+    def create_supply_sparkline_svg(self, ws_village):
+        """Create a small inline SVG of expected (dashed) vs supplied (solid) water.
+        
+        Coordinates are rounded to whole pixels and long series are cut to
+        the sparkline's point budget, so the markup stays a few hundred bytes.
+        """
+        style = SPARKLINE_STYLING
+        width, height = style['width'], style['height']
+        dates, expected, supplied = self._downsampled(ws_village, style['max_points'])
+        if len(dates) == 0:
+            return ''
+        
+        top = max(float(np.nanmax(expected)), float(np.nanmax(supplied)), 1.0)
+        x = np.linspace(2, width - 2, len(dates)) if len(dates) > 1 else np.array([width / 2])
+        
+        def points(values):
+            y = height - 2 - np.nan_to_num(values) / top * (height - 4)
+            return ' '.join(f'{int(round(px))},{int(round(py))}' for px, py in zip(x, y))
+        
+        return (
+            f'<svg class="supply-sparkline" viewBox="0 0 {width} {height}" width="100%" height="{height}" '
+            'aria-hidden="true">'
+            f'<polyline points="{points(expected)}" fill="none" stroke="{style["expected_color"]}" stroke-width="2" stroke-dasharray="4 3"/>'
+            f'<polyline points="{points(supplied)}" fill="none" stroke="{style["supplied_color"]}" stroke-width="2"/>'
+            '</svg>'
+        )
+    
+    def get_supply_sparkline(self, cache_key, ws_village):
+        """Return the sparkline for ``cache_key`` = (scheme, data version); it has no text, so languages share it"""
+        return self.fragment_cache.get_or_create(
+            ('sparkline',) + tuple(cache_key),
+            lambda: self.create_supply_sparkline_svg(ws_village),
+            sizeof=len
+        )
+    
+    def create_mobile_sparkline_html(self, data_processor, current_row, translations):
+        """Create the mobile supply trend card, or '' when the scheme has no supply data"""
+        scheme = current_row['Scheme Name']
+        ws_village = data_processor.get_water_supply_data(scheme)
+        if ws_village is None or ws_village.empty:
+            return ''
+        
+        svg = self.get_supply_sparkline((scheme, data_processor.dataset.version), ws_village)
+        style = SPARKLINE_STYLING
+        return f'''<div class="mobile-sparkline-card">
+        <div class="mobile-satisfaction-title">{translations['water_supply_chart']}</div>
+        {svg}
+        <div class="mobile-sparkline-legend"><span style="color:{style['expected_color']};">- - {translations['expected_water']}</span> <span style="color:{style['supplied_color']};">— {translations['supplied_water']}</span></div>
+        </div>'''
+    
+    def create_mobile_report_html(self, data_processor, current_row, translations):
+        """Create the whole mobile report of one scheme as a single HTML payload"""
+        metrics = data_processor.format_metrics(current_row, translations)
+        satisfaction = data_processor.format_satisfaction(current_row, translations)
+        reliability = data_processor.get_supply_reliability(current_row['Scheme Name'])
+        suggestions = data_processor.get_suggestions(current_row, translations, SUGGESTION_THRESHOLDS)
+        dataset = data_processor.dataset
+        
+        reliability_html = ''
+        if reliability:
+            reliability_html = self.create_reliability_grid_html(reliability, translations)
+        suggestion_items = ''.join(f'<li>{suggestion}</li>' for suggestion in suggestions)
+        
+        page = f'''
+        <div class="mobile-header-bar">
+            <span>{data_processor.format_report_date(translations)}</span>
+            <span style="color:#2d63c7;font-weight:bold;">{translations['title']}</span>
+        </div>
+        <div class="mobile-scheme-title">{current_row['Scheme Name']}</div>
+        <div class="mobile-subdivision">[{current_row['Sub Division']}]</div>
+        <div class="mobile-summary-row">
+            <span class="mobile-summary-icon">📊</span>
+            <span class="mobile-summary-text">
+                <span class="mobile-summary-title">{translations['performance_summary']}</span>
+                <span class="mobile-summary-desc">{translations['performance_description']}</span>
+            </span>
+        </div>
+        <div class="mobile-metrics-grid">{''.join(self.create_mobile_metric_cards_html(metrics))}</div>
+        {reliability_html}
+        {self.create_mobile_satisfaction_html(satisfaction, translations)}
+        {self.create_mobile_sparkline_html(data_processor, current_row, translations)}
+        <div class="mobile-next-steps-card">
+            <div class="mobile-next-steps-title">{translations['next_steps']}</div>
+            <ul style="margin:0 0 0 1rem;padding:0;">{suggestion_items}</ul>
+        </div>
+        <div class="mobile-footer">{data_processor.format_footer(translations)}</div>
+        <p class="mobile-data-version">{translations['data_version'].format(version=dataset.version, seconds=dataset.load_seconds)}</p>
+        <style>.stPlotlyChart, .stDataFrame {{display:none !important;}}</style>
+        '''
+        
+        # No indentation or blank lines, so markdown keeps it as one HTML block
+        return '\n'.join(line.strip() for line in page.splitlines() if line.strip())
+    
+    def build_report_fragments(self, data_processor, current_row, translations, layout):
+        """Build the metrics and satisfaction HTML of one scheme for one layout.
+        
+        The mobile layout is a single payload holding its whole report.
+        """
+        if layout == 'mobile':
+            return {'page': self.create_mobile_report_html(data_processor, current_row, translations)}
+        metrics = data_processor.format_metrics(current_row, translations)
+        satisfaction = data_processor.format_satisfaction(current_row, translations)
+        return {
+            'metrics': self.create_metrics_grid_html(metrics, translations),
+            'satisfaction': self.create_satisfaction_grid_html(satisfaction, translations)
+        }
+    
+    def get_report_fragments(self, cache_key, layout, data_processor, current_row, translations):
+        """Return cached fragments for ``cache_key`` = (scheme key, language, data version)"""
+        return self.fragment_cache.get_or_create(
+            (layout,) + tuple(cache_key),
+            lambda: self.build_report_fragments(data_processor, current_row, translations, layout),
+            sizeof=_fragments_size
+        )
+    
+    def prerender_report_fragments(self, data_processor, languages, layouts=('desktop', 'mobile'), superseded=None):
+        """Render every scheme's fragments into the cache, up to the cache's capacity.
+
+        ``languages`` maps language name → translations. Fragments of the
+        ``superseded`` data version are dropped first, and entries of other
+        versions are evicted as the cache fills, so every new version gets
+        pre-rendered. Returns the number of fragment sets rendered.
+        """
+        if superseded is not None:
+            self.fragment_cache.discard_where(lambda key: key[-1] == superseded)
+        
+        dataset = data_processor.dataset
+        max_bytes = self.fragment_cache.max_bytes
+        rendered = rendered_bytes = 0
+        for scheme_key in dataset.scheme_keys.keys():
+            current_row = data_processor.df.iloc[dataset.scheme_keys.position(*scheme_key)]
+            for language, translations in languages.items():
+                for layout in layouts:
+                    # Stop once this version alone fills the cache, rather than
+                    # evicting the fragments just rendered
+                    if rendered >= self.fragment_cache.max_entries or (
+                        max_bytes is not None and rendered_bytes >= max_bytes
+                    ):
+                        return rendered
+                    fragments = self.build_report_fragments(data_processor, current_row, translations, layout)
+                    size = _fragments_size(fragments)
+                    self.fragment_cache.put((layout, scheme_key, language, dataset.version), fragments, size)
+                    rendered += 1
+                    rendered_bytes += size
+        return rendered
+    
+    def prerender_in_background(self, data_processor, languages):
+        """Start pre-rendering a dataset's fragments once per data version"""
+        version = data_processor.dataset.version
+        with _prerender_lock:
+            superseded = _prerendered_versions.get(data_processor.excel_path)
+            if superseded == version:
+                return
+            _prerendered_versions[data_processor.excel_path] = version
+        threading.Thread(
+            target=self.prerender_report_fragments,
+            args=(data_processor, languages),
+            kwargs={'superseded': superseded},
+            name=f'prerender-{version}',
+            daemon=True
+        ).start()
+
+def _fragments_size(fragments):
+    """Approximate size in bytes of a fragment set"""
+    size = 0
+    for html in fragments.values():
+        size += sum(map(len, html)) if isinstance(html, list) else len(html)
+    return size
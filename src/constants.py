@@ -1,10 +1,20 @@
 # Constants for the Water Supply Dashboard
 
 # File paths
+DATA_DIR = 'data'  # one workbook per reporting period, e.g. '... 2025-06.xlsx'
 EXCEL_PATH = 'data/IVR PoC - Scheme Report Sample.xlsx'
 SHEET_NAME = 'IVR PoC - Scheme Report'
 WATER_SUPPLY_SHEET = 'Water Supply - Last 7 days'
 
+# Columnar snapshots written by build_snapshot.py (one directory per workbook)
+SNAPSHOT_DIR = 'data/snapshots'
+
+# Seconds between checks for an updated workbook
+WATCH_INTERVAL_SECONDS = 30
+
+# Rows converted per chunk while streaming a workbook
+LOAD_CHUNK_ROWS = 50000
+
 # Page configuration
 PAGE_CONFIG = {
     'page_title': "Scheme Report",
@@ -25,6 +35,38 @@ METRICS_COLS = [
     'Sub Division',
 ]
 
+# Ingest schemas: column -> storage type, applied once when a workbook is loaded.
+# 'category' stores repeated strings as codes, 'percent' stores 0-1 fractions
+# as whole percentage points (uint8) and 'datetime' parses to datetime64.
+REPORT_SCHEMA = {
+    'Sl No': 'int32',
+    'Scheme Name': 'category',
+    'Sub Division': 'category',
+    'Division': 'category',
+    'District': 'category',
+    'Gets Water Daily %': 'percent',
+    'Gets Water at Same Time %': 'percent',
+    'Satisfied with Quantity %': 'percent',
+    'Satisfied with Quality %': 'percent',
+    'Overall Happy %': 'percent',
+    'Overall Neutral %': 'percent',
+    'Overall Sad %': 'percent',
+    'Best Scheme in Sub Division Happy %': 'percent',
+    'Sub Division Average Happy %': 'percent',
+}
+
+WATER_SUPPLY_SCHEMA = {
+    'Scheme Name': 'category',
+    'Operation Status': 'category',
+    'Date (Prev 7 days)': 'datetime',
+    '#Tap Connections': 'int32',
+    'Expected water delivery': 'float64',
+    'Water Supplied (in kl)': 'float64',
+}
+
+# UI language names and their translation codes
+LANGUAGES = {'English': 'en', 'Assamese': 'as'}
+
 # Chart colors
 CHART_COLORS = {
     'bar_color': '#7ec8e3',  # light blue
@@ -33,6 +75,9 @@ CHART_COLORS = {
     'line_text_color': '#FFD700'
 }
 
+# One colour per scheme in the comparison chart
+COMPARE_COLORS = ['#2d63c7', '#e67e22', '#27ae60', '#8e44ad', '#c0392b', '#16a085']
+
 # Chart styling
 CHART_STYLING = {
     'bar_opacity': 0.85,
@@ -44,6 +89,54 @@ CHART_STYLING = {
     'margin': {'l': 20, 'r': 20, 't': 110, 'b': 80}
 }
 
+# Mobile supply sparkline (inline SVG)
+SPARKLINE_STYLING = {
+    'width': 300,
+    'height': 64,
+    'max_points': 60,
+    'expected_color': '#7ec8e3',
+    'supplied_color': '#2d63c7'
+}
+
+# Long supply histories: above CHART_LABEL_MAX_POINTS days the chart drops
+# per-point labels and uses WebGL lines, downsampled to CHART_POINT_BUDGET points
+CHART_LABEL_MAX_POINTS = 31
+CHART_POINT_BUDGET = 120
+
+# Rendered chart cache shared by all sessions (bounded by count and JSON size)
+FIGURE_CACHE_MAX_ENTRIES = 256
+FIGURE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Pre-rendered metrics/satisfaction HTML shared by all sessions
+FRAGMENT_CACHE_MAX_ENTRIES = 20000
+FRAGMENT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+PRERENDER_FRAGMENTS = True  # render every scheme in the background after a load
+
+# Startup budget for importing the app, checked by src/import_report.py
+IMPORT_TIME_BUDGET_MS = 2000
+
+# Print how long every page section takes to render
+LOG_RENDER_TIMINGS = False
+
+# Per-rerun budget of the mobile report: deltas and bytes the report fragment
+# sends. The filter bar is 13 deltas (columns, labels and selectboxes) and the
+# report itself one, so any extra delta (e.g. a warning) goes over budget.
+MOBILE_DELTA_BUDGET = 14
+MOBILE_BYTES_BUDGET = 16 * 1024
+
+# Supply shortfall alerts: a day is a shortfall below this share of the
+# expected delivery; severity adds points per day of the current shortfall
+# streak and of the longest run of days without any supply
+SHORTFALL_RATIO = 0.8
+SHORTFALL_STREAK_WEIGHT = 10
+ZERO_SUPPLY_STREAK_WEIGHT = 20
+
+# Rolling supply reliability windows, in days ending on the report date
+ROLLING_WINDOWS = (7, 30, 90)
+
+# Scheme comparison view
+COMPARE_MAX_SCHEMES = 4
+
 # Language translations
 TRANSLATIONS = {
     'en': {
@@ -76,9 +169,45 @@ TRANSLATIONS = {
         'timing_issues': 'Work with operators to establish a regular water supply schedule',
         'quality_issues': 'Test water quality and take necessary remedial measures',
         'general': 'Contact your SO to identify and resolve your scheme issues in time',
-        'report_date': 'Report date: 04 Jun 2025',
-        'footer': 'June 2025 | PHED',
-        'sub_division': 'Sub Division'
+        'report_date': 'Report date: {date}',
+        'footer': '{month} | PHED',
+        'period': 'Period',
+        'sub_division': 'Sub Division',
+        'data_version': 'Data version {version} · loaded in {seconds:.2f}s',
+        'attention_needed': 'Schemes needing attention',
+        'attention_level': 'Show schemes in',
+        'attention_none': 'No schemes need attention here.',
+        'issues': 'Issues',
+        'rule_low_satisfaction': 'Low satisfaction',
+        'rule_timing_issues': 'Irregular timing',
+        'rule_quality_issues': 'Water quality',
+        'what_if': 'What-if thresholds',
+        'what_if_level': 'Count flagged schemes by',
+        'schemes': 'Schemes',
+        'area_summary': 'Area summary',
+        'area_level': 'Summarise',
+        'area_schemes': 'Weighted by tap connections across {count} schemes',
+        'leaderboard': 'Scheme leaderboard',
+        'leaderboard_metric': 'Metric',
+        'leaderboard_order': 'Show',
+        'leaderboard_best': 'Best',
+        'leaderboard_worst': 'Worst',
+        'leaderboard_size': 'Number of schemes',
+        'leaderboard_level': 'Rank schemes in',
+        'rank': 'Rank',
+        'compare': 'Compare schemes',
+        'compare_select': 'Schemes in this division (up to {count})',
+        'metric': 'Metric',
+        'supply_alerts': 'Supply shortfall alerts',
+        'supply_alerts_level': 'Show alerts in',
+        'supply_alerts_none': 'No supply shortfalls.',
+        'supply_alerts_timing': 'Checked {schemes} schemes in {ms:.1f} ms',
+        'date_range': 'Dates',
+        'chart_size': 'Chart: {points} of {days} days shown, {kb:.1f} kB',
+        'reliability': 'Supply reliability',
+        'last_days': 'Last {days} days',
+        'fulfilled': 'of expected water supplied',
+        'supply_days': '{supplied} of {days} days with supply · {kl:.0f} kl'
     },
     'as': {
         'title': 'জল জীৱন মিছন অসম',
@@ -110,9 +239,45 @@ TRANSLATIONS = {
         'timing_issues': 'অপাৰেটৰসকলৰ সৈতে কাম কৰক যাতে এটা নিয়মীয়া পানী যোগান সময়সূচী স্থাপন কৰিব পৰা যায়',
         'quality_issues': 'পানীৰ গুণগত মান পৰীক্ষা কৰক আৰু প্ৰয়োজনীয় চিকিৎসা ব্যৱস্থা গ্ৰহণ কৰক',
         'general': 'আপোনাৰ আঁচনিৰ সমস্যাসমূহ সময়মতে চিনাক্ত আৰু সমাধান কৰিবলৈ আপোনাৰ SO-ৰ সৈতে যোগাযোগ কৰক',
-        'report_date': 'Report date: 04 Jun 2025',
-        'footer': 'June 2025 | PHED',
-        'sub_division': 'উপ-বিভাগ'
+        'report_date': 'Report date: {date}',
+        'footer': '{month} | PHED',
+        'period': 'সময়কাল',
+        'sub_division': 'উপ-বিভাগ',
+        'data_version': 'Data version {version} · loaded in {seconds:.2f}s',
+        'attention_needed': 'মনোযোগ প্ৰয়োজন হোৱা আঁচনিসমূহ',
+        'attention_level': 'আঁচনি দেখুৱাওক',
+        'attention_none': 'ইয়াত কোনো আঁচনিৰ মনোযোগৰ প্ৰয়োজন নাই।',
+        'issues': 'সমস্যা',
+        'rule_low_satisfaction': 'কম সন্তুষ্টি',
+        'rule_timing_issues': 'অনিয়মীয়া সময়',
+        'rule_quality_issues': 'পানীৰ গুণগত মান',
+        'what_if': 'সীমা সলনি কৰি চাওক',
+        'what_if_level': 'চিহ্নিত আঁচনিৰ সংখ্যা',
+        'schemes': 'আঁচনি',
+        'area_summary': 'অঞ্চলৰ সাৰাংশ',
+        'area_level': 'সাৰাংশ কৰক',
+        'area_schemes': '{count}টা আঁচনিৰ টেপ সংযোগ অনুসৰি ভাৰযুক্ত',
+        'leaderboard': 'আঁচনিৰ স্থান তালিকা',
+        'leaderboard_metric': 'মাপকাঠি',
+        'leaderboard_order': 'দেখুৱাওক',
+        'leaderboard_best': 'শ্ৰেষ্ঠ',
+        'leaderboard_worst': 'দুৰ্বলতম',
+        'leaderboard_size': 'আঁচনিৰ সংখ্যা',
+        'leaderboard_level': 'আঁচনিৰ স্থান নিৰ্ণয়',
+        'rank': 'স্থান',
+        'compare': 'আঁচনি তুলনা কৰক',
+        'compare_select': 'এই সংমণ্ডলৰ আঁচনি (সৰ্বাধিক {count}টা)',
+        'metric': 'মাপকাঠি',
+        'supply_alerts': 'পানী যোগানৰ ঘাটিৰ সতৰ্কবাণী',
+        'supply_alerts_level': 'সতৰ্কবাণী দেখুৱাওক',
+        'supply_alerts_none': 'পানী যোগানৰ কোনো ঘাটি নাই।',
+        'supply_alerts_timing': '{schemes}টা আঁচনি {ms:.1f} মিলিছেকেণ্ডত পৰীক্ষা কৰা হ’ল',
+        'date_range': 'তাৰিখ',
+        'chart_size': 'চাৰ্ট: {days} দিনৰ {points} দিন দেখুওৱা হৈছে, {kb:.1f} কিলোবাইট',
+        'reliability': 'পানী যোগানৰ নিৰ্ভৰযোগ্যতা',
+        'last_days': 'শেহতীয়া {days} দিন',
+        'fulfilled': 'প্ৰত্যাশিত পানী যোগান',
+        'supply_days': '{days} দিনৰ ভিতৰত {supplied} দিন যোগান · {kl:.0f} কিলোলিটাৰ'
     }
 }
 
@@ -121,4 +286,25 @@ SUGGESTION_THRESHOLDS = {
     'low_satisfaction': 50,  # Overall Happy % threshold
     'timing_issues': 70,     # Gets Water at Same Time % threshold
     'quality_issues': 70     # Satisfied with Quality % threshold
-} 
\ No newline at end of file
+}
+
+# Suggestion rules: a scheme is flagged when the metric is below the rule's
+# threshold. Each rule owns one bit of the per-scheme rule mask, in this order.
+SUGGESTION_RULES = {
+    'low_satisfaction': 'Overall Happy %',
+    'timing_issues': 'Gets Water at Same Time %',
+    'quality_issues': 'Satisfied with Quality %'
+}
+
+# Leaderboards: translation key of each ranked metric, whether a higher value
+# is better, and the default length
+LEADERBOARD_METRICS = {
+    'Gets Water Daily %': ('gets_water_daily', True),
+    'Gets Water at Same Time %': ('same_time', True),
+    'Satisfied with Quantity %': ('satisfied_quantity', True),
+    'Satisfied with Quality %': ('satisfied_quality', True),
+    'Overall Happy %': ('happy', True),
+    'Overall Neutral %': ('neutral', False),
+    'Overall Sad %': ('sad', False)
+}
+LEADERBOARD_SIZE = 20
@@ -1,139 +1,243 @@
 # Data processing components for the Water Supply Dashboard
 
 import pandas as pd
-from constants import EXCEL_PATH, SHEET_NAME, WATER_SUPPLY_SHEET, METRICS_COLS
+from constants import EXCEL_PATH, LEADERBOARD_METRICS, LEADERBOARD_SIZE, METRICS_COLS, SUGGESTION_THRESHOLDS
+from dataset_cache import DATASET_CACHE
+from indexes import HIERARCHY_COLS
+from suggestions import SUGGESTION_ENGINE
 
 class DataProcessor:
     """Handles all data loading and processing operations"""
     
-    def __init__(self):
+    def __init__(self, excel_path=EXCEL_PATH, cache=DATASET_CACHE):
+        self.excel_path = excel_path
+        self.dataset = None
         self.df = None
         self.water_supply_df = None
-        self._load_data()
-    
-    def _load_data(self):
-        """Load data from Excel files"""
-        try:
-            # Load main data
-            self.df = pd.read_excel(EXCEL_PATH, sheet_name=SHEET_NAME)
-            
-            # Load water supply data
-            self.water_supply_df = pd.read_excel(EXCEL_PATH, sheet_name=WATER_SUPPLY_SHEET)
-            
-            # Prepare data: ensure all relevant columns are present and fill NAs
-            self.df = self.df.fillna(0)
-            self.water_supply_df = self.water_supply_df.fillna(0)
-            
-        except Exception as e:
-            print(f"Error loading data: {e}")
-            # Create empty DataFrames as fallback
-            self.df = pd.DataFrame()
-            self.water_supply_df = pd.DataFrame()
+        self._load_data(excel_path, cache)
+    
+    def _load_data(self, excel_path, cache):
+        """Load data from the process-wide dataset cache"""
+        # The workbook is parsed once per process and shared by all sessions
+        self.dataset = cache.get(excel_path)
+        self.df = self.dataset.df
+        self.water_supply_df = self.dataset.water_supply_df
+    
+    def format_report_date(self, translations):
+        """Format the report date line for the loaded period"""
+        report_date = self.dataset.report_date
+        date = report_date.strftime('%d %b %Y') if report_date is not None else '-'
+        return translations['report_date'].format(date=date)
+    
+    def format_footer(self, translations):
+        """Format the footer for the loaded period"""
+        report_date = self.dataset.report_date
+        month = report_date.strftime('%B %Y') if report_date is not None else ''
+        return translations['footer'].format(month=month)
     
     def get_filter_options(self, selected_district=None, selected_division=None, selected_sub_div=None):
         """Get filter options based on current selections"""
+        hierarchy = self.dataset.hierarchy
         options = {}
         
         # Get districts
-        options['districts'] = self.df['District'].unique().tolist()
+        options['districts'] = hierarchy.districts()
         
         # Get divisions based on selected district
         if selected_district:
-            filtered_by_district = self.df[self.df['District'] == selected_district]
-            options['divisions'] = filtered_by_district['Division'].unique().tolist()
+            options['divisions'] = hierarchy.divisions(selected_district)
         else:
-            options['divisions'] = []
+            options['divisions'] = ()
         
         # Get sub-divisions based on selected district and division
         if selected_district and selected_division:
-            filtered_by_division = filtered_by_district[filtered_by_district['Division'] == selected_division]
-            options['sub_divisions'] = filtered_by_division['Sub Division'].unique().tolist()
+            options['sub_divisions'] = hierarchy.sub_divisions(selected_district, selected_division)
         else:
-            options['sub_divisions'] = []
+            options['sub_divisions'] = ()
         
         # Get schemes based on all selections
         if selected_district and selected_division and selected_sub_div:
-            filtered_df = filtered_by_division[filtered_by_division['Sub Division'] == selected_sub_div]
-            options['schemes'] = filtered_df['Scheme Name'].unique().tolist()
+            options['schemes'] = hierarchy.schemes(selected_district, selected_division, selected_sub_div)
         else:
-            options['schemes'] = []
+            options['schemes'] = ()
         
         return options
     
     def get_filtered_data(self, selected_district, selected_division, selected_sub_div, selected_scheme):
         """Get filtered data based on selections"""
-        filtered_df = self.df[
-            (self.df['District'] == selected_district) &
-            (self.df['Division'] == selected_division) &
-            (self.df['Sub Division'] == selected_sub_div) &
-            (self.df['Scheme Name'] == selected_scheme)
-        ]
-        
-        if filtered_df.empty:
+        position = self.dataset.scheme_keys.position(
+            selected_district, selected_division, selected_sub_div, selected_scheme
+        )
+        
+        if position is None:
             return None
         
-        return filtered_df.iloc[0]
+        return self.df.iloc[position]
     
-    def get_water_supply_data(self, selected_scheme):
-        """Get water supply data for a specific scheme"""
-        ws_village = self.water_supply_df[self.water_supply_df['Scheme Name'] == selected_scheme].copy()
+    def has_conflicting_rows(self, selected_district, selected_division, selected_sub_div, selected_scheme):
+        """Check whether the selected scheme has conflicting duplicate rows"""
+        key = (selected_district, selected_division, selected_sub_div, selected_scheme)
+        return key in self.dataset.scheme_keys.conflicting_keys()
+    
+    def get_water_supply_data(self, selected_scheme, start=None, end=None):
+        """Get water supply data for a specific scheme, optionally between two dates (inclusive)"""
+        rows = self.dataset.supply_groups.slice(selected_scheme, start, end)
         
-        if ws_village.empty:
+        if rows is None:
             return None
         
-        # Ensure data is properly formatted
-        ws_village['Expected water delivery'] = ws_village['Expected water delivery'].fillna(0)
-        ws_village['Water Supplied (in kl)'] = ws_village['Water Supplied (in kl)'].fillna(0)
+        # Rows are grouped by scheme at load, so this is a view, not a scan;
+        # copy-on-write keeps the shared frame read-only
+        return self.water_supply_df.iloc[rows]
+    
+    def get_supply_date_range(self, selected_scheme):
+        """Get the first and last supply date of a scheme as dates, or None"""
+        date_range = self.dataset.supply_groups.date_range(selected_scheme)
+        if date_range is None:
+            return None
         
-        return ws_village
+        return tuple(pd.Timestamp(value).date() for value in date_range)
     
-    def get_suggestions(self, current_row, translations, thresholds):
-        """Generate suggestions based on current metrics"""
-        suggestions = {
-            'low_satisfaction': translations['low_satisfaction'],
-            'timing_issues': translations['timing_issues'],
-            'quality_issues': translations['quality_issues'],
-            'general': translations['general']
-        }
+    def get_comparison_data(self, keys):
+        """Get the report rows and water supply rows of several schemes in one lookup each.
         
-        current_suggestions = []
+        ``keys`` are (district, division, sub division, scheme) tuples; unknown
+        keys are skipped. Returns (report rows in the order given, supply rows
+        of those schemes).
+        """
+        positions = [self.dataset.scheme_keys.position(*key) for key in keys]
+        positions = [position for position in positions if position is not None]
+        rows = self.df.iloc[positions]
         
-        # Check thresholds and add suggestions
-        if current_row['Overall Happy %']*100 < thresholds['low_satisfaction']:
-            current_suggestions.append(suggestions['low_satisfaction'])
+        supply_rows = self.dataset.supply_groups.rows(rows['Scheme Name'].tolist())
+        return rows, self.water_supply_df.iloc[supply_rows]
+    
+    def get_supply_reliability(self, selected_scheme):
+        """Get supply totals of a scheme over each rolling window.
         
-        if current_row['Gets Water at Same Time %']*100 < thresholds['timing_issues']:
-            current_suggestions.append(suggestions['timing_issues'])
+        Returns [(days, totals)] from the shortest window up, skipping windows
+        that reach back no further than the previous one. Each lookup is a
+        difference of prefix sums built at load.
+        """
+        reliability = []
+        for days in self.dataset.supply_windows.windows:
+            totals = self.dataset.supply_windows.window(selected_scheme, days)
+            if totals is None:
+                continue
+            if reliability and totals['days'] == reliability[-1][1]['days']:
+                break
+            reliability.append((days, totals))
         
-        if current_row['Satisfied with Quality %']*100 < thresholds['quality_issues']:
-            current_suggestions.append(suggestions['quality_issues'])
+        return reliability
+    
+    def get_suggestions(self, current_row, translations, thresholds):
+        """Generate suggestions based on current metrics (stored as whole percentages)"""
+        mask = SUGGESTION_ENGINE.evaluate_row(current_row, thresholds)
+        current_suggestions = [translations[rule] for rule in SUGGESTION_ENGINE.rules_for(mask)]
         
         # Always add general suggestion
-        current_suggestions.append(suggestions['general'])
+        current_suggestions.append(translations['general'])
         
         return current_suggestions
     
+    def get_rule_masks(self, thresholds=None):
+        """Get the suggestion rule mask of every scheme in one vectorized pass"""
+        if thresholds is None or thresholds == SUGGESTION_THRESHOLDS:
+            return self.dataset.suggestion_masks
+        return SUGGESTION_ENGINE.evaluate(self.df, thresholds)
+    
+    def get_attention_list(self, path=(), thresholds=None, rule=None):
+        """Get the schemes under a hierarchy node that trip any (or one) suggestion rule.
+        
+        ``path`` is (district, division, sub division), cut to any depth.
+        Returns the schemes' hierarchy columns plus a 'Rules' mask column.
+        """
+        rows = self.dataset.hierarchy.rows(*path)
+        masks = self.get_rule_masks(thresholds)[rows]
+        
+        if rule:
+            hit = (masks & SUGGESTION_ENGINE.bits[rule]) != 0
+        else:
+            hit = masks != 0
+        
+        return self.df.iloc[rows[hit]][HIERARCHY_COLS].assign(Rules=masks[hit])
+    
+    def get_flagged_counts(self, depth, thresholds):
+        """Count, per district (depth 1) or division (depth 2), the schemes each rule would flag.
+        
+        Answered by binary search over the sorted metric arrays built at load,
+        so moving a threshold never re-filters the report frame.
+        """
+        sorted_metrics = self.dataset.sorted_metrics
+        counts = []
+        for path in self.dataset.hierarchy.nodes(depth):
+            row = {'path': path, 'schemes': len(self.dataset.hierarchy.rows(*path))}
+            for rule, column in SUGGESTION_ENGINE.rules.items():
+                row[rule] = sorted_metrics.count_below(path, column, thresholds[rule])
+            counts.append(row)
+        return counts
+    
+    def get_leaderboard(self, path, column, k=LEADERBOARD_SIZE, best=True):
+        """Get the ``k`` best (or worst) schemes by ``column`` under a district or division.
+        
+        Sliced from the per-node orderings built at load, so no request
+        sorts the report frame. "Best" is the highest value, except for
+        metrics where lower is better (e.g. Overall Sad %). Returns the
+        hierarchy columns and the metric in rank order.
+        """
+        _, higher_is_better = LEADERBOARD_METRICS.get(column, (None, True))
+        positions = self.dataset.sorted_metrics.ranked(path, column, k, highest=best == higher_is_better)
+        return self.df.iloc[positions][HIERARCHY_COLS + [column]]
+    
+    def get_supply_alerts(self, path=()):
+        """Get the schemes with supply shortfalls under a hierarchy node, most severe first.
+        
+        The alerts are detected for every scheme at load; this only adds the
+        schemes' hierarchy columns and keeps those under ``path``.
+        """
+        alerts = self.dataset.shortfalls.alerts
+        if alerts.empty:
+            return alerts
+        
+        rows = self.df.iloc[self.dataset.hierarchy.rows(*path)]
+        hierarchy = rows[HIERARCHY_COLS].astype(str).drop_duplicates('Scheme Name')
+        return hierarchy.merge(alerts.astype({'Scheme Name': str}), on='Scheme Name').sort_values(
+            'Severity', ascending=False, kind='stable'
+        ).reset_index(drop=True)
+    
+    def get_rollup(self, path=()):
+        """Return the weighted aggregate metrics of a district/division/sub-division.
+        
+        Values are rounded to whole percentages so the result can be passed
+        to format_metrics and format_satisfaction like a scheme row.
+        """
+        aggregate = self.dataset.rollup.aggregate(path)
+        if aggregate is None:
+            return None
+        
+        return {col: (value if col == 'schemes' else int(round(value))) for col, value in aggregate.items()}
+    
     def format_metrics(self, current_row, translations):
         """Format metrics for display"""
         metrics = {
             'gets_water_daily': {
                 'label': translations['gets_water_daily'],
-                'value': int(current_row['Gets Water Daily %']*100),
+                'value': int(current_row['Gets Water Daily %']),
                 'icon': '💧'
             },
             'same_time': {
                 'label': translations['same_time'],
-                'value': int(current_row['Gets Water at Same Time %']*100),
+                'value': int(current_row['Gets Water at Same Time %']),
                 'icon': '⏰'
             },
             'satisfied_quantity': {
                 'label': translations['satisfied_quantity'],
-                'value': int(current_row['Satisfied with Quantity %']*100),
+                'value': int(current_row['Satisfied with Quantity %']),
                 'icon': '🚰'
             },
             'satisfied_quality': {
                 'label': translations['satisfied_quality'],
-                'value': int(current_row['Satisfied with Quality %']*100),
+                'value': int(current_row['Satisfied with Quality %']),
                 'icon': '✅'
             }
         }
@@ -145,19 +249,19 @@ class DataProcessor:
         satisfaction = {
             'happy': {
                 'label': translations['happy'],
-                'value': int(current_row['Overall Happy %']*100),
+                'value': int(current_row['Overall Happy %']),
                 'emoji': '😊',
                 'class': 'satisfaction-happy'
             },
             'neutral': {
                 'label': translations['neutral'],
-                'value': int(current_row['Overall Neutral %']*100),
+                'value': int(current_row['Overall Neutral %']),
                 'emoji': '😐',
                 'class': 'satisfaction-neutral'
             },
             'sad': {
                 'label': translations['sad'],
-                'value': int(current_row['Overall Sad %']*100),
+                'value': int(current_row['Overall Sad %']),
                 'emoji': '😔',
                 'class': 'satisfaction-sad'
             }
@@ -0,0 +1,97 @@
+# Background reloading of updated report workbooks
+
+import threading
+
+from dataset import file_signature
+from constants import WATCH_INTERVAL_SECONDS
+
+class DataWatcher:
+    """Polls tracked workbooks and reloads changed ones off the request path.
+
+    A workbook is only reloaded once its (mtime, size) signature has been
+    the same for two polls in a row, so files that are still being copied
+    in are not parsed half-written.
+    """
+
+    def __init__(self, cache, interval=WATCH_INTERVAL_SECONDS):
+        self.cache = cache
+        self.interval = interval
+        self._seen = {}
+        self._pending = {}
+        self._listeners = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def track(self, path):
+        """Watch ``path`` and stop the cache from re-checking it per request"""
+        try:
+            self._seen[path] = file_signature(path)
+        except OSError:
+            self._seen[path] = None
+        self.cache.watch(path)
+
+    def add_listener(self, callback):
+        """Call ``callback()`` on every poll, e.g. to discover new workbooks"""
+        self._listeners.append(callback)
+
+    def start(self):
+        """Start polling in a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='data-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop polling"""
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Error reloading data: {e}")
+
+    def poll(self):
+        """Check every tracked workbook once; returns the paths that were swapped"""
+        for callback in self._listeners:
+            callback()
+        swapped = []
+        for path in list(self._seen):
+            try:
+                signature = file_signature(path)
+            except OSError:
+                # Missing for now, e.g. between delete and re-create
+                continue
+            if signature == self._seen[path]:
+                self._pending.pop(path, None)
+                continue
+            if self._pending.get(path) != signature:
+                # Changed since the last poll; wait for it to settle
+                self._pending[path] = signature
+                continue
+            del self._pending[path]
+            self._seen[path] = signature
+            if self.cache.refresh(path):
+                swapped.append(path)
+        return swapped
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+def watch_period_store(store):
+    """Start the process-wide watcher (once) for every partition of ``store``.
+
+    Changed workbooks are reloaded by the watcher and new ones are ingested
+    by the store on each poll.
+    """
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = DataWatcher(store.cache)
+            for period in store.periods():
+                _watcher.track(store.path_for(period))
+            store.on_new_partition.append(_watcher.track)
+            _watcher.add_listener(store.refresh)
+            _watcher.start()
+    return _watcher
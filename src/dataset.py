@@ -0,0 +1,177 @@
+# Shared, read-only dataset for the Water Supply Dashboard
+
+import hashlib
+import os
+import time
+
+import pandas as pd
+from constants import (
+    SHEET_NAME, WATER_SUPPLY_SHEET, REPORT_SCHEMA, WATER_SUPPLY_SCHEMA,
+    LOAD_CHUNK_ROWS, SNAPSHOT_DIR, SUGGESTION_THRESHOLDS, ROLLING_WINDOWS
+)
+from anomalies import ShortfallReport
+from schema import memory_bytes
+from rollup import ROLLUP_COLS, RollupCube, changed_rows, scheme_weights
+from suggestions import SUGGESTION_ENGINE
+from snapshot import read_manifest, read_snapshot, snapshot_dir_for, write_snapshot
+from workbook_loader import read_workbook
+from indexes import (
+    HierarchyIndex, SchemeKeyIndex, SortedMetricIndex, SupplyGroupIndex, SupplyWindowIndex, group_contiguously
+)
+
+# Views handed out of the shared dataset must never write back into it
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+def file_signature(path):
+    """Return the cheap (mtime, size) signature of a file"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def file_content_hash(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class Dataset:
+    """Immutable snapshot of both report sheets loaded from one workbook.
+
+    A Dataset is shared by every Streamlit session in the process, so the
+    frames it holds must be treated as read-only by callers.
+    """
+
+    def __init__(self, df, water_supply_df, source_path=None, signature=None, content_hash=None, load_seconds=0.0, previous=None):
+        self.df = df
+        # Supply rows grouped by scheme and in date order within each scheme
+        self.water_supply_df = group_contiguously(water_supply_df, 'Scheme Name', 'Date (Prev 7 days)')
+        self.source_path = source_path
+        self.signature = signature
+        self.content_hash = content_hash
+        self.load_seconds = load_seconds
+        self.memory_report = {}
+        self.report_date = self._latest_supply_date()
+        
+        # Lookup indexes are built once here and shared with every session
+        self.hierarchy = HierarchyIndex(df)
+        self.scheme_keys = SchemeKeyIndex(df)
+        self.supply_groups = SupplyGroupIndex(self.water_supply_df)
+        
+        # Suggestion rule mask of every scheme at the configured thresholds
+        self.suggestion_masks = SUGGESTION_ENGINE.evaluate(df, SUGGESTION_THRESHOLDS)
+        # Sorted metrics per district/division for threshold what-ifs and leaderboards
+        self.sorted_metrics = SortedMetricIndex(df, self.hierarchy, ROLLUP_COLS)
+        
+        # District/division/sub-division aggregates, updated from the previous
+        # version of this workbook when only a few schemes changed
+        self.scheme_weights = scheme_weights(df, self.water_supply_df)
+        self.rollup = self._build_rollup(previous)
+        
+        # Supply shortfall alerts of every scheme
+        self.shortfalls = ShortfallReport(self.water_supply_df)
+        # Prefix sums for rolling supply totals per scheme
+        self.supply_windows = SupplyWindowIndex(self.water_supply_df, self.report_date, ROLLING_WINDOWS)
+
+    def _build_rollup(self, previous):
+        if previous is None or previous.df.empty or self.df.empty:
+            return RollupCube.build(self.df, self.scheme_weights)
+        removed, added = changed_rows(previous.df, previous.scheme_weights, self.df, self.scheme_weights)
+        if len(removed) + len(added) > len(self.df) // 2:
+            return RollupCube.build(self.df, self.scheme_weights)
+        return previous.rollup.updated(
+            previous.df.iloc[removed], previous.scheme_weights[removed],
+            self.df.iloc[added], self.scheme_weights[added]
+        )
+
+    def _latest_supply_date(self):
+        if 'Date (Prev 7 days)' not in self.water_supply_df.columns:
+            return None
+        latest = self.water_supply_df['Date (Prev 7 days)'].max()
+        return None if pd.isna(latest) else latest
+
+    @property
+    def period(self):
+        """Reporting period (YYYY-MM) of the latest supply data"""
+        return self.report_date.strftime('%Y-%m') if self.report_date is not None else None
+
+    @property
+    def version(self):
+        """Short identifier of the data this snapshot was built from"""
+        return self.content_hash[:12] if self.content_hash else 'empty'
+
+    @classmethod
+    def empty(cls, source_path=None):
+        """Create an empty dataset used when the workbook cannot be read"""
+        return cls(pd.DataFrame(), pd.DataFrame(), source_path=source_path)
+
+def load_dataset(path, signature=None, content_hash=None, snapshot_root=SNAPSHOT_DIR, previous=None):
+    """Load the workbook at ``path`` into a Dataset.
+
+    A fresh columnar snapshot is memory-mapped when one exists; otherwise
+    the workbook itself is parsed. ``previous`` is the dataset this one
+    replaces, if any, so derived aggregates can be updated incrementally.
+    """
+    started = time.perf_counter()
+    signature = signature or file_signature(path)
+    content_hash = content_hash or file_content_hash(path)
+
+    manifest = None
+    if snapshot_root:
+        directory = snapshot_dir_for(path, snapshot_root)
+        manifest = read_manifest(directory)
+    if manifest is not None and manifest['source'].get('content_hash') == content_hash:
+        frames, manifest = read_snapshot(directory, manifest)
+        memory_report = manifest['source'].get('memory_report', {})
+    else:
+        frames, memory_report = _parse_workbook(path)
+        print(f"Parsed {path}: {memory_report['before_bytes'] / 1024:.1f} kB as read, "
+              f"{memory_report['after_bytes'] / 1024:.1f} kB after dtype coercion")
+
+    dataset = Dataset(
+        frames[SHEET_NAME],
+        frames[WATER_SUPPLY_SHEET],
+        source_path=path,
+        signature=signature,
+        content_hash=content_hash,
+        previous=previous
+    )
+    dataset.load_seconds = time.perf_counter() - started
+    dataset.memory_report = memory_report
+    
+    if dataset.scheme_keys.duplicates:
+        conflicting = len(dataset.scheme_keys.conflicting_keys())
+        print(f"Warning: {len(dataset.scheme_keys.duplicates)} duplicate scheme keys in {path} ({conflicting} conflicting)")
+    
+    return dataset
+
+def _parse_workbook(path):
+    """Parse both sheets from the workbook itself"""
+    # Stream both sheets in one pass, converting to the declared compact dtypes
+    frames, stats = read_workbook(
+        path,
+        {SHEET_NAME: REPORT_SCHEMA, WATER_SUPPLY_SHEET: WATER_SUPPLY_SCHEMA},
+        LOAD_CHUNK_ROWS
+    )
+    memory_report = {
+        'before_bytes': sum(sheet['before_bytes'] for sheet in stats.values()),
+        'after_bytes': sum(memory_bytes(df) for df in frames.values()),
+        'rows': {name: sheet['rows'] for name, sheet in stats.items()}
+    }
+    return frames, memory_report
+
+def build_snapshot(path, snapshot_root=SNAPSHOT_DIR):
+    """Parse the workbook at ``path`` and write its columnar snapshot"""
+    dataset = load_dataset(path, snapshot_root=None)
+    source = {
+        'path': os.path.abspath(path),
+        'signature': list(dataset.signature),
+        'content_hash': dataset.content_hash,
+        'period': dataset.period,
+        'memory_report': dataset.memory_report
+    }
+    directory = snapshot_dir_for(path, snapshot_root)
+    # Store the frames in the grouped, date-ordered layout the indexes expect
+    write_snapshot(directory, {SHEET_NAME: dataset.df, WATER_SUPPLY_SHEET: dataset.water_supply_df}, source)
+    return directory, dataset
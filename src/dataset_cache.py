@@ -0,0 +1,113 @@
+# Process-wide dataset cache for the Water Supply Dashboard
+
+import threading
+import time
+
+from dataset import Dataset, file_content_hash, file_signature, load_dataset
+
+class DatasetCache:
+    """Keeps one shared Dataset per workbook path for the whole process.
+
+    Every Streamlit rerun asks the cache for the dataset. The workbook is
+    only parsed again when its mtime/size changes *and* its content hash
+    differs from the one already loaded.
+
+    Paths registered with ``watch`` are refreshed by a background watcher
+    instead: ``get`` then returns the current dataset without touching the
+    file, and ``refresh`` swaps in a fully built replacement.
+    """
+
+    def __init__(self, loader=load_dataset):
+        self._loader = loader
+        self._datasets = {}
+        self._watched = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.last_reload_at = None
+
+    def get(self, path):
+        """Return the dataset for ``path``, loading or reloading it if needed"""
+        dataset = self._datasets.get(path)
+        if dataset is not None and path in self._watched:
+            self.hits += 1
+            return dataset
+
+        try:
+            signature = file_signature(path)
+        except OSError as e:
+            print(f"Error loading data: {e}")
+            return dataset or Dataset.empty(path)
+
+        if dataset is not None and dataset.signature == signature:
+            self.hits += 1
+            return dataset
+
+        return self._load(path, signature)
+
+    def refresh(self, path):
+        """Reload ``path`` if its contents changed; returns True on a swap"""
+        try:
+            signature = file_signature(path)
+        except OSError as e:
+            print(f"Error loading data: {e}")
+            return False
+        previous = self._datasets.get(path)
+        return self._load(path, signature) is not previous
+
+    def _load(self, path, signature):
+        with self._lock:
+            # Another session may have refreshed the entry while we waited
+            dataset = self._datasets.get(path)
+            if dataset is not None and dataset.signature == signature:
+                self.hits += 1
+                return dataset
+
+            content_hash = file_content_hash(path)
+            if dataset is not None and dataset.content_hash == content_hash:
+                # File was touched but not changed: keep the parsed frames
+                dataset.signature = signature
+                self.hits += 1
+                return dataset
+
+            try:
+                fresh = self._loader(path, signature=signature, content_hash=content_hash, previous=dataset)
+            except Exception as e:
+                print(f"Error loading data: {e}")
+                return dataset or Dataset.empty(path)
+
+            if dataset is None:
+                self.misses += 1
+            else:
+                self.reloads += 1
+                self.last_reload_at = time.time()
+            # A single reference swap: readers see the old or the new dataset,
+            # never a partially built one
+            self._datasets[path] = fresh
+            return fresh
+
+    def watch(self, path):
+        """Let a background watcher, not the request path, refresh ``path``"""
+        self._watched.add(path)
+
+    def invalidate(self, path=None):
+        """Drop one cached dataset, or all of them when ``path`` is None"""
+        with self._lock:
+            if path is None:
+                self._datasets.clear()
+            else:
+                self._datasets.pop(path, None)
+
+    def stats(self):
+        """Return hit/miss/reload counters"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'reloads': self.reloads,
+            'entries': len(self._datasets),
+            'last_reload_at': self.last_reload_at
+        }
+
+# Shared by every session served by this process
+DATASET_CACHE = DatasetCache()
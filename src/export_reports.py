@@ -0,0 +1,236 @@
+# Export per-scheme report cards (HTML or PNG) for every scheme in parallel
+#
+# Usage: python src/export_reports.py [--excel PATH] [--out DIR] [--format html|png]
+#                                     [--district D [--division V [--sub-division S]]]
+#                                     [--languages English Assamese] [--workers N] [--force]
+#
+# Existing report files are skipped, so an interrupted export picks up where
+# it stopped. PNG output needs the optional kaleido package.
+
+import argparse
+import html
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from chart_builder import ChartBuilder
+from constants import EXCEL_PATH, LANGUAGES, SNAPSHOT_DIR, SUGGESTION_THRESHOLDS, TRANSLATIONS
+from data_processor import DataProcessor
+from dataset import build_snapshot, file_content_hash
+from snapshot import read_manifest, snapshot_dir_for
+from styles import get_css_bundle
+
+EXPORT_DIR = 'exports'
+CHUNK_SCHEMES = 25
+PNG_SIZE = {'width': 900, 'height': 1250}
+
+# Per-worker state, set up once by _init_worker
+_processor = None
+_chart_builder = None
+
+def _safe_name(name):
+    """Turn a district/scheme name into a file name"""
+    return re.sub(r'[^\w\-. ]+', '_', str(name)).strip() or '_'
+
+def report_path(out_dir, language, key, output_format):
+    """Return the output file of one scheme's report card"""
+    *folders, scheme = (_safe_name(part) for part in key)
+    return os.path.join(out_dir, LANGUAGES[language], *folders, f'{scheme}.{output_format}')
+
+def create_report_html(data_processor, chart_builder, current_row, translations):
+    """Create a standalone HTML report card of one scheme"""
+    fragments = chart_builder.build_report_fragments(data_processor, current_row, translations, 'desktop')
+    suggestions = data_processor.get_suggestions(current_row, translations, SUGGESTION_THRESHOLDS)
+    suggestion_items = ''.join(f'<li>{suggestion}</li>' for suggestion in suggestions)
+
+    chart_html = ''
+    ws_village = data_processor.get_water_supply_data(current_row['Scheme Name'])
+    if ws_village is not None and not ws_village.empty:
+        fig = chart_builder.create_water_supply_chart(ws_village, translations)
+        chart_html = fig.to_html(full_html=False, include_plotlyjs='cdn')
+
+    return f'''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{html.escape(str(current_row['Scheme Name']))} | {translations['title']}</title>
+{get_css_bundle()}
+</head>
+<body style="background:#f0f6ff; font-family:sans-serif; max-width:900px; margin:0 auto; padding:1rem;">
+<p style="color:#666;">{data_processor.format_report_date(translations)}</p>
+<h2>{translations['title']}</h2>
+<h3 style="color:#1a237e;">{html.escape(str(current_row['Scheme Name']))}, {html.escape(str(current_row['Sub Division']))}</h3>
+<h3>{translations['performance_summary']}</h3>
+{fragments['metrics']}
+<h3 style="color:#1a237e;">{translations['overall_satisfaction']}</h3>
+{fragments['satisfaction']}
+{chart_html}
+<div class="suggested-steps"><h3 style="margin-top:0;">{translations['next_steps']}</h3><ul>{suggestion_items}</ul></div>
+<p style="text-align:right; color:#666;">{data_processor.format_footer(translations)}</p>
+</body>
+</html>
+'''
+
+def create_report_figure(data_processor, chart_builder, current_row, translations):
+    """Create the report card of one scheme as a single figure, for image export"""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    metrics = data_processor.format_metrics(current_row, translations)
+    satisfaction = data_processor.format_satisfaction(current_row, translations)
+    suggestions = data_processor.get_suggestions(current_row, translations, SUGGESTION_THRESHOLDS)
+
+    fig = make_subplots(
+        rows=3, cols=4,
+        specs=[
+            [{'type': 'domain'}] * 4,
+            [{'type': 'domain'}] * 3 + [None],
+            [{'type': 'xy', 'colspan': 4}, None, None, None]
+        ],
+        row_heights=[0.22, 0.22, 0.56],
+        vertical_spacing=0.08
+    )
+    for col, metric_data in enumerate(metrics.values(), start=1):
+        fig.add_trace(go.Indicator(
+            mode='number',
+            value=metric_data['value'],
+            number={'suffix': '%', 'font': {'color': '#2d63c7'}},
+            title={'text': f"{metric_data['icon']} {metric_data['label']}", 'font': {'size': 13}}
+        ), row=1, col=col)
+    for col, satisfaction_data in enumerate(satisfaction.values(), start=1):
+        fig.add_trace(go.Indicator(
+            mode='number',
+            value=satisfaction_data['value'],
+            number={'suffix': '%'},
+            title={'text': f"{satisfaction_data['emoji']} {satisfaction_data['label']}", 'font': {'size': 13}}
+        ), row=2, col=col)
+
+    ws_village = data_processor.get_water_supply_data(current_row['Scheme Name'])
+    if ws_village is not None and not ws_village.empty:
+        for trace in chart_builder.create_water_supply_chart(ws_village, translations).data:
+            fig.add_trace(trace, row=3, col=1)
+
+    fig.update_layout(
+        title={'text': f"{current_row['Scheme Name']}, {current_row['Sub Division']}<br>"
+                       f"<sup>{translations['title']} · {data_processor.format_report_date(translations)}</sup>"},
+        template='simple_white',
+        barmode='group',
+        legend={'orientation': 'h', 'y': -0.05},
+        margin={'t': 110, 'b': 60 + 24 * len(suggestions), 'l': 40, 'r': 40},
+        annotations=list(fig.layout.annotations) + [{
+            'text': f"<b>{translations['next_steps']}</b><br>" + '<br>'.join(f'• {suggestion}' for suggestion in suggestions),
+            'xref': 'paper', 'yref': 'paper', 'x': 0, 'y': -0.08,
+            'xanchor': 'left', 'yanchor': 'top', 'align': 'left', 'showarrow': False
+        }],
+        **PNG_SIZE
+    )
+    return fig
+
+def _init_worker(excel_path):
+    global _processor, _chart_builder
+    # Each worker memory-maps the snapshot the parent made sure exists
+    _processor = DataProcessor(excel_path=excel_path)
+    _chart_builder = ChartBuilder()
+
+def _write_atomically(path, write):
+    """Write via a temporary file, so an interrupted export never leaves a partial report"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    staging = f'{path}.partial'
+    write(staging)
+    os.replace(staging, path)
+
+def _export_chunk(keys, languages, out_dir, output_format, force):
+    """Worker: export every language of a chunk of schemes; returns (written, skipped)"""
+    written = skipped = 0
+    for key in keys:
+        current_row = _processor.get_filtered_data(*key)
+        for language in languages:
+            path = report_path(out_dir, language, key, output_format)
+            if not force and os.path.exists(path):
+                skipped += 1
+                continue
+            translations = TRANSLATIONS[LANGUAGES[language]]
+            if output_format == 'png':
+                fig = create_report_figure(_processor, _chart_builder, current_row, translations)
+                _write_atomically(path, lambda target: fig.write_image(target, format='png'))
+            else:
+                page = create_report_html(_processor, _chart_builder, current_row, translations)
+                _write_atomically(path, lambda target: _write_text(target, page))
+            written += 1
+    return written, skipped
+
+def _write_text(path, text):
+    with open(path, 'w', encoding='utf-8') as handle:
+        handle.write(text)
+
+def _ensure_snapshot(excel_path):
+    """Build the workbook's snapshot once here, so workers map it instead of parsing"""
+    manifest = read_manifest(snapshot_dir_for(excel_path, SNAPSHOT_DIR))
+    if manifest is None or manifest['source'].get('content_hash') != file_content_hash(excel_path):
+        build_snapshot(excel_path, SNAPSHOT_DIR)
+
+def select_schemes(data_processor, district=None, division=None, sub_division=None):
+    """Return the scheme keys under the given (partial) hierarchy path"""
+    path = tuple(part for part in (district, division, sub_division) if part)
+    return [key for key in data_processor.dataset.scheme_keys.keys() if key[:len(path)] == path]
+
+def main():
+    """Export report cards for the selected schemes"""
+    parser = argparse.ArgumentParser(description='Export per-scheme report cards.')
+    parser.add_argument('--excel', default=EXCEL_PATH, help='report workbook (default: %(default)s)')
+    parser.add_argument('--out', default=EXPORT_DIR, help='output directory (default: %(default)s)')
+    parser.add_argument('--format', choices=('html', 'png'), default='html', help='output format (default: %(default)s)')
+    parser.add_argument('--district', help='only schemes in this district')
+    parser.add_argument('--division', help='only schemes in this division (with --district)')
+    parser.add_argument('--sub-division', help='only schemes in this sub division (with --division)')
+    parser.add_argument('--languages', nargs='+', choices=list(LANGUAGES), default=list(LANGUAGES), help='languages to export')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='worker processes (default: %(default)s)')
+    parser.add_argument('--force', action='store_true', help='overwrite reports that already exist')
+    args = parser.parse_args()
+
+    if args.format == 'png':
+        try:
+            import kaleido  # noqa: F401
+        except ImportError:
+            parser.error('PNG export needs the optional kaleido package (pip install kaleido)')
+    if (args.division and not args.district) or (args.sub_division and not args.division):
+        parser.error('--division needs --district and --sub-division needs --division')
+
+    _ensure_snapshot(args.excel)
+    keys = select_schemes(DataProcessor(excel_path=args.excel), args.district, args.division, args.sub_division)
+    if not keys:
+        print("No schemes match the selection.")
+        return
+
+    chunks = [keys[i:i + CHUNK_SCHEMES] for i in range(0, len(keys), CHUNK_SCHEMES)]
+    total = len(keys) * len(args.languages)
+    print(f"Exporting {total} {args.format.upper()} reports ({len(keys)} schemes) to {args.out} with {args.workers} workers")
+
+    started = time.perf_counter()
+    written = skipped = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(args.excel,)) as pool:
+        futures = [
+            pool.submit(_export_chunk, chunk, args.languages, args.out, args.format, args.force)
+            for chunk in chunks
+        ]
+        for future in as_completed(futures):
+            try:
+                chunk_written, chunk_skipped = future.result()
+            except Exception as e:
+                print(f"Error exporting reports: {e}")
+                continue
+            written += chunk_written
+            skipped += chunk_skipped
+            elapsed = time.perf_counter() - started
+            rate = written / elapsed if elapsed else 0.0
+            remaining = total - written - skipped
+            eta = f"{remaining / rate:.0f}s" if rate else '?'
+            print(f"  {written + skipped}/{total} done ({skipped} skipped), {rate:.1f} reports/s, ETA {eta}")
+
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {written} reports, skipped {skipped} existing, in {elapsed:.1f}s "
+          f"({written / elapsed if elapsed else 0:.1f} reports/s)")
+
+if __name__ == "__main__":
+    main()
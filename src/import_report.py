@@ -0,0 +1,65 @@
+# Report how long importing the dashboard takes, against a startup budget
+#
+# Usage: python src/import_report.py [--module app] [--budget-ms MS] [--top N]
+#
+# Runs a fresh interpreter with ``-X importtime`` and exits non-zero when the
+# import takes longer than the budget.
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from constants import IMPORT_TIME_BUDGET_MS
+
+def measure_imports(module):
+    """Import ``module`` in a fresh interpreter; returns [(depth, self_us, cumulative_us, name)]"""
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=src_dir, capture_output=True, text=True, check=True
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((depth, int(self_us), int(cumulative_us), name.strip()))
+    return entries
+
+def main():
+    """Print the import-time report and check it against the budget"""
+    parser = argparse.ArgumentParser(description='Report the import time of a dashboard module.')
+    parser.add_argument('--module', default='app', help='module to import (default: %(default)s)')
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_TIME_BUDGET_MS, help='budget in ms (default: %(default)s)')
+    parser.add_argument('--top', type=int, default=10, help='number of entries per table (default: %(default)s)')
+    args = parser.parse_args()
+
+    entries = measure_imports(args.module)
+    total_us = sum(cumulative for depth, _, cumulative, _ in entries if depth == 0)
+
+    # Direct imports of the module, by cumulative time
+    direct = sorted((entry for entry in entries if entry[0] == 1), key=lambda entry: -entry[2])
+    print(f"Direct imports of {args.module}:")
+    for _, _, cumulative, name in direct[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    # Own time of every module, summed per top-level package
+    packages = defaultdict(int)
+    for _, self_us, _, name in entries:
+        packages[name.split('.')[0]] += self_us
+    print("Packages by own import time:")
+    for name, self_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    loaded = {name for _, _, _, name in entries}
+    print(f"plotly imported: {'yes' if 'plotly' in loaded else 'no'}")
+    print(f"Total: {total_us / 1000:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if total_us / 1000 > args.budget_ms:
+        print("Over budget")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+# Load-time lookup indexes for the Water Supply Dashboard
+
+import numpy as np
+import pandas as pd
+
+HIERARCHY_COLS = ['District', 'Division', 'Sub Division', 'Scheme Name']
+
+class HierarchyIndex:
+    """District → Division → Sub Division → Scheme options, built once.
+
+    Each level is stored as a tuple in first-seen order, keyed by the path
+    of its ancestors, so every lookup is a single dictionary access. The
+    row positions under every node are kept too, for per-node analytics.
+    """
+
+    def __init__(self, df):
+        self._districts = ()
+        self._divisions = {}
+        self._sub_divisions = {}
+        self._schemes = {}
+        self._rows = {(): np.arange(len(df))}
+        if not df.empty:
+            self._build(df)
+
+    def _build(self, df):
+        districts = {}
+        divisions = {}
+        sub_divisions = {}
+        schemes = {}
+        rows = {}
+
+        columns = [df[col].tolist() for col in HIERARCHY_COLS]
+        for position, (district, division, sub_div, scheme) in enumerate(zip(*columns)):
+            # dicts double as ordered sets
+            districts[district] = None
+            divisions.setdefault(district, {})[division] = None
+            sub_divisions.setdefault((district, division), {})[sub_div] = None
+            schemes.setdefault((district, division, sub_div), {})[scheme] = None
+            rows.setdefault((district,), []).append(position)
+            rows.setdefault((district, division), []).append(position)
+            rows.setdefault((district, division, sub_div), []).append(position)
+
+        self._districts = tuple(districts)
+        self._divisions = {key: tuple(values) for key, values in divisions.items()}
+        self._sub_divisions = {key: tuple(values) for key, values in sub_divisions.items()}
+        self._schemes = {key: tuple(values) for key, values in schemes.items()}
+        for path, positions in rows.items():
+            self._rows[path] = np.asarray(positions, dtype=np.intp)
+
+    def districts(self):
+        """Return all districts"""
+        return self._districts
+
+    def divisions(self, district):
+        """Return the divisions of a district"""
+        return self._divisions.get(district, ())
+
+    def sub_divisions(self, district, division):
+        """Return the sub-divisions of a division"""
+        return self._sub_divisions.get((district, division), ())
+
+    def schemes(self, district, division, sub_div):
+        """Return the schemes of a sub-division"""
+        return self._schemes.get((district, division, sub_div), ())
+
+    def rows(self, *path):
+        """Return the row positions under a node, e.g. ``rows(district, division)``.
+
+        An empty path is the whole sheet.
+        """
+        return self._rows.get(tuple(path), np.empty(0, dtype=np.intp))
+
+    def nodes(self, depth):
+        """Return the paths of every node at ``depth`` (1 = district ... 3 = sub-division)"""
+        return [path for path in self._rows if len(path) == depth]
+
+class SchemeKeyIndex:
+    """Unique (District, Division, Sub Division, Scheme Name) → row position.
+
+    Duplicate keys are not resolved silently: every key that appears more
+    than once is listed in ``duplicates``, flagged as conflicting when the
+    repeated rows disagree on any value. Lookups of a duplicated key return
+    its first row so the result is at least deterministic.
+    """
+
+    def __init__(self, df, ignore_cols=('Sl No',)):
+        self._positions = {}
+        self._conflicting = frozenset()
+        self.duplicates = []
+        if not df.empty:
+            self._build(df, ignore_cols)
+
+    def _build(self, df, ignore_cols):
+        columns = [df[col].tolist() for col in HIERARCHY_COLS]
+        for position, key in enumerate(zip(*columns)):
+            self._positions.setdefault(key, position)
+
+        if len(self._positions) == len(df):
+            return
+
+        # Report duplicated keys and whether their rows actually disagree
+        repeated = df[df.duplicated(subset=HIERARCHY_COLS, keep=False)]
+        value_cols = [col for col in df.columns if col not in ignore_cols]
+        for key, group in repeated.groupby(HIERARCHY_COLS, sort=False, observed=True):
+            distinct_rows = group[value_cols].drop_duplicates()
+            self.duplicates.append({
+                'key': key,
+                'rows': group.index.tolist(),
+                'conflicting': len(distinct_rows) > 1
+            })
+        self._conflicting = frozenset(entry['key'] for entry in self.duplicates if entry['conflicting'])
+
+    def __len__(self):
+        return len(self._positions)
+
+    def keys(self):
+        """Return every unique scheme key in sheet order"""
+        return self._positions.keys()
+
+    def position(self, district, division, sub_div, scheme):
+        """Return the row position of a scheme, or None if it is unknown"""
+        return self._positions.get((district, division, sub_div, scheme))
+
+    def conflicting_keys(self):
+        """Return the keys whose duplicate rows hold different values"""
+        return self._conflicting
+
+def group_contiguously(df, column, order_by=None):
+    """Return ``df`` with the rows of each ``column`` value stored contiguously.
+
+    Within a group rows are ordered by ``order_by`` when given; the sort is
+    stable, so otherwise they keep their original order. Frames that are
+    already in that order are returned unchanged.
+    """
+    if df.empty or column not in df.columns:
+        return df
+    by = [column] if order_by is None or order_by not in df.columns else [column, order_by]
+    values = df[column]
+    runs = int((values != values.shift()).sum())
+    if runs == values.nunique(dropna=False) and (len(by) == 1 or _ascending_within_runs(values, df[order_by])):
+        return df
+    return df.sort_values(by, kind='stable').reset_index(drop=True)
+
+def _ascending_within_runs(values, order_values):
+    same_group = (values == values.shift()).to_numpy()[1:]
+    order_values = order_values.to_numpy()
+    return not (same_group & (order_values[1:] < order_values[:-1])).any()
+
+class SupplyGroupIndex:
+    """Scheme Name → (start, stop) row offsets into the grouped supply sheet.
+
+    The sheet is ordered by date within each scheme at ingest, so the dates
+    of a scheme are a sorted slice of ``dates`` and a date range resolves to
+    narrower offsets by binary search.
+    """
+
+    def __init__(self, df, column='Scheme Name', date_col='Date (Prev 7 days)'):
+        self._offsets = {}
+        self.dates = None
+        if not df.empty and column in df.columns:
+            self._build(df[column])
+        if not df.empty and date_col in df.columns:
+            self.dates = df[date_col].to_numpy()
+            self.dates.flags.writeable = False
+
+    def _build(self, values):
+        # Group boundaries are where the (categorical) code changes
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.array.codes
+            labels = values.cat.categories
+        else:
+            codes, labels = pd.factorize(values)
+        starts = np.concatenate(([0], np.flatnonzero(codes[1:] != codes[:-1]) + 1))
+        stops = np.append(starts[1:], len(codes))
+        names = labels[codes[starts]].tolist()
+        self._offsets = dict(zip(names, zip(starts.tolist(), stops.tolist())))
+
+    def __contains__(self, scheme):
+        return scheme in self._offsets
+
+    def slice(self, scheme, start=None, end=None):
+        """Return the row slice of a scheme, optionally cut to dates in [start, end].
+
+        ``start`` and ``end`` are days (anything np.datetime64 accepts); the
+        end day is included. Returns None if the scheme has no rows.
+        """
+        offsets = self._offsets.get(scheme)
+        if offsets is None:
+            return None
+        first, stop = offsets
+        if self.dates is None or (start is None and end is None):
+            return slice(first, stop)
+        # A view of the scheme's sorted dates: nothing is scanned or copied
+        dates = self.dates[first:stop]
+        lo, hi = 0, len(dates)
+        if start is not None:
+            lo = int(np.searchsorted(dates, np.datetime64(start, 'D'), side='left'))
+        if end is not None:
+            hi = int(np.searchsorted(dates, np.datetime64(end, 'D') + 1, side='left'))
+        return slice(first + lo, first + max(lo, hi))
+
+    def date_range(self, scheme):
+        """Return the first and last date of a scheme, or None"""
+        offsets = self._offsets.get(scheme)
+        if offsets is None or self.dates is None:
+            return None
+        dates = self.dates[offsets[0]:offsets[1]]
+        dates = dates[~np.isnat(dates)]
+        if len(dates) == 0:
+            return None
+        return dates[0], dates[-1]
+
+    def rows(self, schemes):
+        """Return the row positions of several schemes as one array, in the order given"""
+        ranges = [np.arange(*self._offsets[scheme]) for scheme in schemes if scheme in self._offsets]
+        if not ranges:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate(ranges)
+
+class SortedMetricIndex:
+    """Per-node sorted metric values for instant threshold what-ifs and leaderboards.
+
+    For the whole sheet, every district and every division, each metric's
+    values are stored sorted together with the frame positions in that
+    order, so "how many schemes are below t?" is a binary search and "the
+    k worst schemes" is a slice rather than a filter and sort over the frame.
+    """
+
+    def __init__(self, df, hierarchy, columns, max_depth=2):
+        self._sorted = {}
+        self._order = {}
+        self.columns = [col for col in columns if col in df.columns]
+        if df.empty:
+            return
+        for col in self.columns:
+            values = df[col].to_numpy()
+            for depth in range(max_depth + 1):
+                for path in hierarchy.nodes(depth):
+                    rows = hierarchy.rows(*path)
+                    order = rows[np.argsort(values[rows], kind='stable')].astype(np.int32)
+                    sorted_values = values[order]
+                    order.flags.writeable = False
+                    sorted_values.flags.writeable = False
+                    self._order[(path, col)] = order
+                    self._sorted[(path, col)] = sorted_values
+
+    def size(self, path, column):
+        """Return the number of schemes under a node"""
+        return len(self._sorted.get((tuple(path), column), ()))
+
+    def count_below(self, path, column, threshold):
+        """Return how many schemes under ``path`` have ``column`` below ``threshold``"""
+        sorted_values = self._sorted.get((tuple(path), column))
+        if sorted_values is None:
+            return 0
+        return int(np.searchsorted(sorted_values, threshold, side='left'))
+
+    def ranked(self, path, column, k, highest=False):
+        """Return the frame positions of the ``k`` lowest (or highest) schemes under ``path``.
+
+        Ties keep sheet order in both directions.
+        """
+        key = (tuple(path), column)
+        order = self._order.get(key)
+        if order is None or k <= 0:
+            return np.empty(0, dtype=np.int32)
+        if not highest:
+            return order[:k]
+        # Take the top k values together with the rest of the tie group at the
+        # cut, then order them by descending value, stably (as float, since the
+        # compact schema stores percentages unsigned)
+        sorted_values = self._sorted[key]
+        start = int(np.searchsorted(sorted_values, sorted_values[-min(k, len(order))], side='left'))
+        descending = np.argsort(-sorted_values[start:].astype(np.float64), kind='stable')
+        return order[start:][descending][:k]
+
+class SupplyWindowIndex:
+    """Per-scheme prefix sums of the supply sheet for rolling-window statistics.
+
+    Supply rows are ordered by scheme and date once at load, and cumulative
+    sums of supplied water, expected water and days with any supply are kept
+    alongside. The first row of every ``windows`` day span ending on
+    ``report_date`` is located for all schemes at once, so the totals of a
+    window are the difference of two prefix sums.
+    """
+
+    def __init__(self, df, report_date, windows,
+                 date_col='Date (Prev 7 days)', expected_col='Expected water delivery',
+                 supplied_col='Water Supplied (in kl)'):
+        self.windows = tuple(windows)
+        self._groups = {}
+        self._window_starts = {}
+        required = {'Scheme Name', date_col, expected_col, supplied_col}
+        if df.empty or report_date is None or not required <= set(df.columns):
+            return
+        self._build(df, report_date, date_col, expected_col, supplied_col)
+
+    def _build(self, df, report_date, date_col, expected_col, supplied_col):
+        names = df['Scheme Name']
+        if isinstance(names.dtype, pd.CategoricalDtype):
+            codes, labels = names.array.codes, names.cat.categories
+        else:
+            codes, labels = pd.factorize(names)
+        days = df[date_col].to_numpy().astype('datetime64[D]')
+
+        # Scheme-then-date order; rows without a scheme or a date are left out
+        kept = np.flatnonzero((codes >= 0) & ~np.isnat(days))
+        if len(kept) == 0:
+            return
+        order = kept[np.lexsort((days[kept], codes[kept]))]
+        codes = codes[order]
+        self.dates = days[order]
+        self.dates.flags.writeable = False
+
+        supplied = df[supplied_col].to_numpy(dtype='float64')[order]
+        expected = df[expected_col].to_numpy(dtype='float64')[order]
+        self._supplied = np.concatenate(([0.0], np.cumsum(supplied)))
+        self._expected = np.concatenate(([0.0], np.cumsum(expected)))
+        self._supply_days = np.concatenate(([0], np.cumsum(supplied > 0)))
+
+        starts = np.concatenate(([0], np.flatnonzero(codes[1:] != codes[:-1]) + 1))
+        stops = np.append(starts[1:], len(codes))
+        self._starts, self._stops = starts, stops
+        self._groups = {name: group for group, name in enumerate(labels[codes[starts]].tolist())}
+
+        # (scheme, day) as one sortable key, so every scheme's window start is
+        # found with a single vectorized searchsorted
+        day_numbers = self.dates.astype(np.int64)
+        first_day = int(day_numbers.min())
+        span = int(day_numbers.max()) - first_day + 1
+        group_ids = np.repeat(np.arange(len(starts)), stops - starts)
+        keys = group_ids * span + (day_numbers - first_day)
+        last_day = int(np.datetime64(report_date, 'D').astype(np.int64))
+        for window in self.windows:
+            offset = last_day - window + 1 - first_day
+            targets = np.arange(len(starts)) * span + offset
+            self._window_starts[window] = np.maximum(np.searchsorted(keys, targets, side='left'), starts)
+
+    def __contains__(self, scheme):
+        return scheme in self._groups
+
+    def _totals(self, start, stop):
+        supplied = self._supplied[stop] - self._supplied[start]
+        expected = self._expected[stop] - self._expected[start]
+        return {
+            'supplied': float(supplied),
+            'expected': float(expected),
+            'fulfilment': float(100 * supplied / expected) if expected > 0 else None,
+            'supply_days': int(self._supply_days[stop] - self._supply_days[start]),
+            'days': int(stop - start)
+        }
+
+    def window(self, scheme, days):
+        """Return supply totals of ``scheme`` over the last ``days`` days, or None"""
+        group = self._groups.get(scheme)
+        if group is None or days not in self._window_starts:
+            return None
+        return self._totals(int(self._window_starts[days][group]), int(self._stops[group]))
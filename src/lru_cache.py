@@ -0,0 +1,93 @@
+# Bounded LRU cache for rendered dashboard artefacts
+
+import threading
+from collections import OrderedDict
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count and, optionally, bytes.
+
+    Values are shared by every session in the process, so callers must not
+    mutate what they get back.
+    """
+
+    def __init__(self, max_entries, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key`` and mark it as recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size=0):
+        """Store ``value`` (``size`` bytes) and evict the least recently used"""
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or
+                (self.max_bytes is not None and self._bytes > self.max_bytes and len(self._entries) > 1)
+            ):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_create(self, key, factory, sizeof=None):
+        """Return the cached value, building and storing it with ``factory`` on a miss"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = factory()
+            self.put(key, value, sizeof(value) if sizeof else 0)
+        return value
+
+    def size(self, key):
+        """Return the stored size of ``key``, or None if it is not cached"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry[1]
+    
+    def discard_where(self, predicate):
+        """Drop every entry whose key satisfies ``predicate``; returns how many were dropped"""
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                _, size = self._entries.pop(key)
+                self._bytes -= size
+            return len(stale)
+    
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Return size and hit-rate statistics"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
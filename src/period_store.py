@@ -0,0 +1,163 @@
+# Multi-period store of monthly report workbooks
+
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from constants import DATA_DIR, SHEET_NAME, SNAPSHOT_DIR
+from dataset import build_snapshot, file_content_hash, file_signature
+from snapshot import read_manifest, snapshot_dir_for
+
+PERIOD_PATTERN = re.compile(r'(\d{4})[-_](\d{2})')
+
+def _build_partition(path, snapshot_root):
+    """Worker: parse one workbook and write its snapshot"""
+    build_snapshot(path, snapshot_root)
+    return path
+
+class PeriodStore:
+    """Append-only store with one partition per reporting period.
+
+    Every workbook in ``directory`` becomes a partition, keyed by the
+    YYYY-MM period in its file name or, failing that, the month of its
+    latest supply date. New workbooks are parsed in parallel across cores
+    and written as columnar snapshots, so partitions that were ingested
+    once are memory-mapped on later starts instead of parsed again.
+    Ingesting only reads snapshot manifests; a partition's data is loaded
+    through the cache when its period is selected.
+    """
+
+    def __init__(self, cache, directory=DATA_DIR, snapshot_root=SNAPSHOT_DIR, settle_seconds=2.0):
+        self.cache = cache
+        self.directory = directory
+        self.snapshot_root = snapshot_root
+        self.settle_seconds = settle_seconds
+        self._partitions = {}
+        self._paths = set()
+        self._failed = {}
+        self._lock = threading.Lock()
+        self.on_new_partition = []
+
+    def _workbooks(self):
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError as e:
+            print(f"Error loading data: {e}")
+            return []
+        return sorted(
+            entry.path for entry in entries
+            if entry.is_file() and entry.name.endswith('.xlsx') and not entry.name.startswith('~$')
+        )
+
+    def _fresh_manifest(self, path):
+        """Return the manifest of an up-to-date snapshot of ``path``, or None"""
+        manifest = read_manifest(snapshot_dir_for(path, self.snapshot_root))
+        if manifest is None or manifest['source'].get('content_hash') != file_content_hash(path):
+            return None
+        # Snapshots written before the period was recorded are rebuilt once
+        if 'period' not in manifest['source']:
+            return None
+        return manifest
+
+    def refresh(self):
+        """Ingest workbooks that are not partitions yet; returns the new periods"""
+        with self._lock:
+            now = time.time()
+            new_paths = {}
+            for path in self._workbooks():
+                if path in self._paths:
+                    continue
+                signature = file_signature(path)
+                # Leave files that are still being written for the next round
+                if now - signature[0] / 1e9 < self.settle_seconds:
+                    continue
+                # Workbooks that failed to ingest are retried once they change
+                if self._failed.get(path) == signature:
+                    continue
+                new_paths[path] = signature
+            if not new_paths:
+                return []
+
+            manifests = {path: self._fresh_manifest(path) for path in new_paths}
+            stale = [path for path, manifest in manifests.items() if manifest is None]
+            self._parse_in_parallel(stale)
+            for path in stale:
+                manifests[path] = self._fresh_manifest(path)
+
+            added = []
+            for path, signature in new_paths.items():
+                manifest = manifests[path]
+                if manifest is None or not manifest['sheets'].get(SHEET_NAME, {}).get('rows'):
+                    self._failed[path] = signature
+                    continue
+                self._failed.pop(path, None)
+                self._paths.add(path)
+                period = self.period_for(path, manifest['source'].get('period'))
+                if period in self._partitions:
+                    # Partitions are append-only: the first workbook for a period wins
+                    print(f"Warning: {path} ignored, period {period} is already loaded from {self._partitions[period]}")
+                    continue
+                self._partitions[period] = path
+                added.append(period)
+
+        for callback in self.on_new_partition:
+            for period in added:
+                callback(self._partitions[period])
+        return added
+
+    def _parse_in_parallel(self, paths):
+        if len(paths) == 1:
+            try:
+                build_snapshot(paths[0], self.snapshot_root)
+            except Exception as e:
+                print(f"Error loading data: {e}")
+            return
+        if not paths:
+            return
+        workers = min(len(paths), os.cpu_count() or 1)
+        # Spawned, not forked: this runs from the script and watcher threads of
+        # a multi-threaded server, and a forked worker could inherit held locks
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = [pool.submit(_build_partition, path, self.snapshot_root) for path in paths]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    # The cache falls back to parsing this workbook itself
+                    print(f"Error loading data: {e}")
+
+    @staticmethod
+    def period_for(path, data_period=None):
+        """Return the period a workbook belongs to.
+
+        ``data_period`` is the month of the workbook's latest supply date,
+        as recorded in its snapshot manifest.
+        """
+        match = PERIOD_PATTERN.search(os.path.basename(path))
+        if match:
+            return f'{match.group(1)}-{match.group(2)}'
+        return data_period or os.path.splitext(os.path.basename(path))[0]
+
+    def periods(self):
+        """Return all periods, newest first"""
+        return sorted(self._partitions, reverse=True)
+
+    def path_for(self, period):
+        """Return the workbook path of a period's partition"""
+        return self._partitions.get(period)
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_period_store(cache):
+    """Return the process-wide period store, ingesting the data directory once"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PeriodStore(cache)
+            _store.refresh()
+    return _store
@@ -0,0 +1,141 @@
+# Hierarchical rollups of the scheme metrics for the Water Supply Dashboard
+
+import numpy as np
+import pandas as pd
+from constants import METRICS_COLS, REPORT_SCHEMA
+
+LEVEL_COLS = ['District', 'Division', 'Sub Division']
+
+# The percentage metrics that are aggregated (Sub Division is a label, not a metric)
+ROLLUP_COLS = [col for col in METRICS_COLS if REPORT_SCHEMA.get(col) == 'percent']
+
+def scheme_weights(df, water_supply_df):
+    """Return each report row's weight: the scheme's tap connections (households)"""
+    if df.empty or water_supply_df.empty or '#Tap Connections' not in water_supply_df.columns:
+        return np.zeros(len(df))
+    taps = water_supply_df.groupby('Scheme Name', observed=True)['#Tap Connections'].max()
+    taps.index = taps.index.astype(str)
+    return taps.reindex(df['Scheme Name'].astype(str)).fillna(0).to_numpy(dtype='float64')
+
+def _contributions(df, weights, columns):
+    """One row per scheme: its level labels and what it adds to every sum"""
+    contributions = {col: df[col].astype(str).to_numpy() for col in LEVEL_COLS}
+    contributions['schemes'] = np.ones(len(df))
+    contributions['weight'] = weights
+    for col in columns:
+        values = df[col].to_numpy(dtype='float64')
+        contributions[f'w:{col}'] = values * weights
+        contributions[f'u:{col}'] = values
+    return pd.DataFrame(contributions)
+
+def _group_sums(contributions):
+    """Sum the contributions for every node at every level, keyed by node path"""
+    value_cols = [col for col in contributions.columns if col not in LEVEL_COLS]
+    sums = {}
+    if contributions.empty:
+        return sums
+    sums[()] = contributions[value_cols].to_numpy().sum(axis=0)
+    for depth in range(1, len(LEVEL_COLS) + 1):
+        grouped = contributions.groupby(LEVEL_COLS[:depth], sort=False)[value_cols].sum()
+        for path, values in zip(grouped.index, grouped.to_numpy()):
+            sums[path if isinstance(path, tuple) else (path,)] = values
+    return sums
+
+class RollupCube:
+    """Weighted aggregates of every district, division and sub-division.
+
+    Percentages are averaged over schemes weighted by their tap connections,
+    so a large scheme counts for more than a small one; nodes without any
+    tap data fall back to a plain mean. The cube only stores sums, so it can
+    be updated for a handful of changed schemes without re-aggregating.
+    """
+
+    def __init__(self, sums, columns=ROLLUP_COLS):
+        self.columns = list(columns)
+        self._sums = sums
+        self._aggregates = {}
+
+    @classmethod
+    def build(cls, df, weights, columns=ROLLUP_COLS):
+        """Aggregate a whole report frame with vectorized group-bys"""
+        if df.empty:
+            return cls({}, columns)
+        return cls(_group_sums(_contributions(df, weights, columns)), columns)
+
+    def updated(self, removed, removed_weights, added, added_weights):
+        """Return a new cube with ``removed`` rows taken out and ``added`` rows put in.
+
+        Only the nodes above the changed schemes are touched; this cube is
+        left as it is, since other sessions may still be reading it.
+        """
+        sums = dict(self._sums)
+        for frame, weights, sign in ((removed, removed_weights, -1), (added, added_weights, 1)):
+            if frame.empty:
+                continue
+            for path, delta in _group_sums(_contributions(frame, weights, self.columns)).items():
+                total = sums.get(path, 0) + sign * delta
+                if total[0] <= 0:
+                    sums.pop(path, None)
+                else:
+                    sums[path] = total
+        return RollupCube(sums, self.columns)
+
+    def aggregate(self, path=()):
+        """Return {metric: percentage} for a node, or None if it is unknown"""
+        path = tuple(path)
+        aggregate = self._aggregates.get(path)
+        if aggregate is None:
+            sums = self._sums.get(path)
+            if sums is None:
+                return None
+            schemes, weight = sums[0], sums[1]
+            count = len(self.columns)
+            if weight > 0:
+                values = sums[2:2 + 2 * count:2] / weight
+            else:
+                values = sums[3:3 + 2 * count:2] / schemes
+            aggregate = dict(zip(self.columns, values.tolist()))
+            aggregate['schemes'] = int(round(schemes))
+            self._aggregates[path] = aggregate
+        return aggregate
+
+def changed_rows(old_df, old_weights, new_df, new_weights, columns=ROLLUP_COLS):
+    """Return (positions only in old, positions only in new) of two report frames.
+
+    Schemes are compared as a multiset on their labels, rolled-up metrics
+    and weight, so unchanged schemes drop out and an edited scheme shows up
+    once on each side.
+    """
+    labels = LEVEL_COLS + ['Scheme Name']
+    if len(old_df) == len(new_df) and all(
+        old_df[col].astype(str).to_numpy().tolist() == new_df[col].astype(str).to_numpy().tolist()
+        for col in labels
+    ):
+        # Same schemes in the same order (the usual in-place edit): compare values directly
+        changed = np.asarray(old_weights) != np.asarray(new_weights)
+        for col in columns:
+            changed |= old_df[col].to_numpy() != new_df[col].to_numpy()
+        positions = np.flatnonzero(changed)
+        return positions, positions
+
+    compared = labels + list(columns)
+
+    def keyed(df, weights):
+        frame = pd.DataFrame({col: df[col].astype(str).to_numpy() for col in labels})
+        for col in columns:
+            frame[col] = df[col].to_numpy()
+        frame['weight'] = weights
+        frame['_occurrence'] = frame.groupby(compared + ['weight'], sort=False).cumcount()
+        frame['_position'] = np.arange(len(frame))
+        return frame
+
+    merged = keyed(old_df, old_weights).merge(
+        keyed(new_df, new_weights),
+        on=compared + ['weight', '_occurrence'],
+        how='outer',
+        indicator=True,
+        suffixes=('_old', '_new')
+    )
+    removed = merged.loc[merged['_merge'] == 'left_only', '_position_old'].astype(int).to_numpy()
+    added = merged.loc[merged['_merge'] == 'right_only', '_position_new'].astype(int).to_numpy()
+    return np.sort(removed), np.sort(added)
@@ -0,0 +1,23 @@
+# Ingest schema coercion for the Water Supply Dashboard
+
+import numpy as np
+import pandas as pd
+
+def coerce_column(values, kind):
+    """Convert one raw column to the storage type declared in a schema"""
+    if kind == 'category':
+        return values.fillna('').astype(str).astype('category')
+    if kind == 'percent':
+        fractions = pd.to_numeric(values, errors='coerce').fillna(0).to_numpy(dtype='float64')
+        return pd.Series(np.rint(fractions * 100).clip(0, 255).astype('uint8'), index=values.index)
+    if kind == 'datetime':
+        return pd.to_datetime(values, errors='coerce')
+    if kind is None:
+        # Undeclared columns keep the dashboard's historic NA handling
+        return values.fillna(0)
+    # Plain numeric types such as 'int32' or 'float64'
+    return pd.to_numeric(values, errors='coerce').fillna(0).astype(kind)
+
+def memory_bytes(df):
+    """Return the deep memory footprint of a DataFrame in bytes"""
+    return int(df.memory_usage(deep=True).sum())
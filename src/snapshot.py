@@ -0,0 +1,108 @@
+# Columnar binary snapshots of the report workbook
+
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_NAME = 'manifest.json'
+SNAPSHOT_FORMAT = 2  # 2: supply rows ordered by scheme, then date
+
+# Read once at import: os.umask can only be read by setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def snapshot_dir_for(excel_path, snapshot_root):
+    """Return the snapshot directory used for a workbook"""
+    stem = os.path.splitext(os.path.basename(excel_path))[0]
+    return os.path.join(snapshot_root, stem)
+
+def _write_frame(df, directory, prefix):
+    """Save each column of ``df`` as its own .npy file and describe it"""
+    columns = []
+    for position, name in enumerate(df.columns):
+        values = df[name]
+        entry = {'name': name, 'file': f'{prefix}_{position}.npy'}
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            array = values.array.codes
+            entry['categories'] = [str(category) for category in values.cat.categories]
+        elif values.dtype == object or pd.api.types.is_string_dtype(values.dtype):
+            # Free-text columns are stored dictionary-encoded as well
+            categorical = pd.Categorical(values.astype(str))
+            array = categorical.codes
+            entry['categories'] = list(categorical.categories)
+        else:
+            array = values.to_numpy()
+        np.save(os.path.join(directory, entry['file']), np.ascontiguousarray(array), allow_pickle=False)
+        columns.append(entry)
+    return {'rows': len(df), 'columns': columns}
+
+def _read_frame(description, directory):
+    """Rebuild a DataFrame whose columns are memory-mapped from disk"""
+    columns = {}
+    for entry in description['columns']:
+        array = np.load(os.path.join(directory, entry['file']), mmap_mode='r', allow_pickle=False)
+        if 'categories' in entry:
+            columns[entry['name']] = pd.Categorical.from_codes(array, categories=entry['categories'])
+        else:
+            columns[entry['name']] = array
+    # copy=False keeps every column backed by the shared, read-only mapping
+    return pd.DataFrame(columns, copy=False)
+
+def write_snapshot(directory, frames, source):
+    """Atomically write ``frames`` (sheet name → DataFrame) as a snapshot.
+
+    ``source`` describes the workbook the frames came from and is stored in
+    the manifest so readers can check freshness.
+    """
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.snapshot-', dir=parent)
+    try:
+        # mkdtemp makes the directory private (0700); publish it with the
+        # usual permissions so processes of other users can map it too
+        os.chmod(staging, 0o777 & ~_UMASK)
+        manifest = {'format': SNAPSHOT_FORMAT, 'source': source, 'sheets': {}}
+        for index, (sheet_name, df) in enumerate(frames.items()):
+            manifest['sheets'][sheet_name] = _write_frame(df, staging, f'sheet{index}')
+        with open(os.path.join(staging, MANIFEST_NAME), 'w', encoding='utf-8') as handle:
+            json.dump(manifest, handle, ensure_ascii=False, indent=1)
+
+        # Readers that already mapped the old files keep their pages
+        retired = None
+        if os.path.exists(directory):
+            retired = directory + '.old'
+            shutil.rmtree(retired, ignore_errors=True)
+            os.replace(directory, retired)
+        os.replace(staging, directory)
+        if retired:
+            shutil.rmtree(retired, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return manifest
+
+def read_manifest(directory):
+    """Return a snapshot's manifest, or None if there is no usable snapshot"""
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), encoding='utf-8') as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('format') != SNAPSHOT_FORMAT:
+        return None
+    return manifest
+
+def read_snapshot(directory, manifest=None):
+    """Memory-map every sheet of a snapshot; returns (frames, manifest)"""
+    manifest = manifest or read_manifest(directory)
+    if manifest is None:
+        raise FileNotFoundError(f"No snapshot in {directory}")
+    frames = {
+        sheet_name: _read_frame(description, directory)
+        for sheet_name, description in manifest['sheets'].items()
+    }
+    return frames, manifest
@@ -1,5 +1,8 @@
 # Styling components for the Water Supply Dashboard
 
+import hashlib
+import re
+
 def get_main_css():
     """Return the main CSS styling for the dashboard"""
     return """
@@ -114,6 +117,17 @@ def get_metrics_grid_css():
         text-align: center;
         min-width: 0;
     }
+    .reliability-grid {
+        display: grid;
+        grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
+        gap: 1rem;
+        margin-bottom: 1.2rem;
+    }
+    .reliability-detail {
+        font-size: 0.9rem;
+        color: #666;
+        margin-top: 0.3rem;
+    }
     @media (max-width: 600px) {
         .metrics-grid, .mobile-metrics-grid {
             grid-template-columns: 1fr 1fr !important;
@@ -248,6 +262,18 @@ def get_mobile_layout_css():
             padding: 1rem 0.5rem 0.7rem 0.5rem;
             margin-bottom: 1.2rem;
         }
+        .mobile-sparkline-card {
+            background: #fff;
+            border-radius: 16px;
+            box-shadow: 0 1px 4px rgba(0,0,0,0.07);
+            padding: 1rem 0.7rem 0.7rem 0.7rem;
+            margin-bottom: 1.2rem;
+        }
+        .mobile-sparkline-legend {
+            font-size: 0.8rem;
+            text-align: center;
+            margin-top: 0.3rem;
+        }
         .mobile-satisfaction-title {
             font-size: 1.1rem;
             font-weight: bold;
@@ -301,6 +327,11 @@ def get_mobile_layout_css():
             font-size: 1rem;
             margin-top: 2rem;
         }
+        .mobile-data-version {
+            text-align: center;
+            color: #999;
+            font-size: 0.8rem;
+        }
         /* Hide chart and table in mobile */
         .mobile-hide { display: none !important; }
     }
@@ -333,4 +364,29 @@ def get_container_css():
         .stApp { margin-top: -100px !important; }
         .main .block-container { padding-top: 0 !important; margin-top: 0 !important; }
         </style>
-    """ 
\ No newline at end of file
+    """ 
+
+def _minify_css(css):
+    """Strip comments and redundant whitespace from a stylesheet"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+def _build_css_bundle():
+    """Join every stylesheet into one minified, content-hashed <style> block"""
+    blocks = [
+        get_main_css(), get_metrics_grid_css(), get_satisfaction_grid_css(),
+        get_mobile_layout_css(), get_toggle_switch_css(), get_container_css()
+    ]
+    css = _minify_css(''.join(re.sub(r'</?style>', '', block) for block in blocks))
+    digest = hashlib.sha256(css.encode('utf-8')).hexdigest()[:12]
+    return digest, f'<style id="wsd-css-{digest}">{css}</style>'
+
+# Built once per process at import
+CSS_BUNDLE_HASH, CSS_BUNDLE = _build_css_bundle()
+
+def get_css_bundle():
+    """Return all dashboard CSS as a single minified <style> block"""
+    return CSS_BUNDLE
@@ -0,0 +1,41 @@
+# Vectorized suggestion rules for the Water Supply Dashboard
+
+import numpy as np
+from constants import SUGGESTION_RULES
+
+class SuggestionEngine:
+    """Evaluates every suggestion rule over a whole report frame at once.
+
+    The result is one integer mask per scheme where bit ``i`` is set when
+    the ``i``-th rule in ``SUGGESTION_RULES`` flags the scheme. Adding a rule
+    adds one vectorized comparison, never another pass over the rows.
+    """
+
+    def __init__(self, rules=SUGGESTION_RULES):
+        self.rules = dict(rules)
+        self.bits = {rule: 1 << i for i, rule in enumerate(self.rules)}
+        self.mask_dtype = np.min_scalar_type((1 << len(self.rules)) - 1)
+
+    def evaluate(self, df, thresholds):
+        """Return the rule mask of every row of ``df``"""
+        masks = np.zeros(len(df), dtype=self.mask_dtype)
+        for rule, column in self.rules.items():
+            if rule in thresholds and column in df.columns:
+                flagged = df[column].to_numpy() < thresholds[rule]
+                masks[flagged] |= self.bits[rule]
+        return masks
+
+    def evaluate_row(self, row, thresholds):
+        """Return the rule mask of a single report row"""
+        mask = 0
+        for rule, column in self.rules.items():
+            if rule in thresholds and row[column] < thresholds[rule]:
+                mask |= self.bits[rule]
+        return mask
+
+    def rules_for(self, mask):
+        """Return the rule keys set in ``mask``, in rule order"""
+        return [rule for rule, bit in self.bits.items() if mask & bit]
+
+# Shared by every dataset and session
+SUGGESTION_ENGINE = SuggestionEngine()
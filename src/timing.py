@@ -0,0 +1,126 @@
+# Render timing instrumentation for the Water Supply Dashboard
+
+import functools
+import threading
+import time
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from constants import LOG_RENDER_TIMINGS
+
+class RenderTimings:
+    """Process-wide count, total and last duration of each rendered section.
+
+    With page fragments, an interaction only re-executes the fragments whose
+    inputs changed, so comparing a section's runs with the page's shows how
+    much server time each interaction saves.
+    """
+
+    def __init__(self, log=LOG_RENDER_TIMINGS):
+        self.log = log
+        self._sections = {}
+        self._lock = threading.Lock()
+
+    def record(self, section, seconds):
+        """Add one run of ``section`` that took ``seconds``"""
+        with self._lock:
+            stats = self._sections.setdefault(section, {'runs': 0, 'total_seconds': 0.0, 'last_seconds': 0.0})
+            stats['runs'] += 1
+            stats['total_seconds'] += seconds
+            stats['last_seconds'] = seconds
+        if self.log:
+            print(f"Rendered {section} in {seconds * 1000:.1f} ms")
+
+    def record_payload(self, section, deltas, size):
+        """Record the number of deltas and bytes the last run of ``section`` sent"""
+        with self._lock:
+            stats = self._sections.setdefault(section, {'runs': 0, 'total_seconds': 0.0, 'last_seconds': 0.0})
+            stats['last_deltas'] = deltas
+            stats['last_bytes'] = size
+        if self.log:
+            print(f"Sent {section}: {deltas} deltas, {size} bytes")
+
+    def stats(self):
+        """Return {section: {runs, total_seconds, last_seconds, mean_seconds, ...}}"""
+        with self._lock:
+            return {
+                section: dict(stats, mean_seconds=stats['total_seconds'] / stats['runs'] if stats['runs'] else 0.0)
+                for section, stats in self._sections.items()
+            }
+
+    def clear(self):
+        """Forget all recorded runs"""
+        with self._lock:
+            self._sections.clear()
+
+RENDER_TIMINGS = RenderTimings()
+
+def timed(section, timings=RENDER_TIMINGS):
+    """Decorator recording how long every run of a render function takes"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings.record(section, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+class PayloadMeter:
+    """Counts the deltas and bytes the script run sends while it is active.
+
+    Use as a context manager around a section; every message the run
+    enqueues in between is counted, including widgets, CSS and warnings
+    sent by nested code. On exit the totals are recorded in ``timings`` and
+    a warning is printed when the run went over ``max_deltas`` or
+    ``max_bytes``.
+    """
+
+    def __init__(self, section, max_deltas=None, max_bytes=None, timings=RENDER_TIMINGS):
+        self.section = section
+        self.max_deltas = max_deltas
+        self.max_bytes = max_bytes
+        self.timings = timings
+        self.deltas = 0
+        self.bytes = 0
+        self._ctx = None
+        self._enqueue = None
+
+    def _count(self, msg):
+        if msg.WhichOneof('type') == 'delta':
+            self.deltas += 1
+        self.bytes += msg.ByteSize()
+        self._enqueue(msg)
+
+    def __enter__(self):
+        self._ctx = get_script_run_ctx()
+        if self._ctx is not None:
+            # Shadow the context's enqueue for this run; nested meters chain
+            self._enqueue = self._ctx.enqueue
+            self._ctx.enqueue = self._count
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._ctx is None:
+            return False
+        if self._enqueue.__self__ is self._ctx:
+            del self._ctx.enqueue
+        else:
+            self._ctx.enqueue = self._enqueue
+        self.timings.record_payload(self.section, self.deltas, self.bytes)
+        if self.max_deltas is not None and self.deltas > self.max_deltas:
+            print(f"Warning: {self.section} sent {self.deltas} deltas (budget {self.max_deltas})")
+        if self.max_bytes is not None and self.bytes > self.max_bytes:
+            print(f"Warning: {self.section} sent {self.bytes} bytes (budget {self.max_bytes})")
+        return False
+
+def metered(section, timings=RENDER_TIMINGS):
+    """Decorator recording the deltas and bytes every run of a render function sends"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with PayloadMeter(section, timings=timings):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,101 @@
+# Streaming workbook reader for the Water Supply Dashboard
+
+import sys
+
+import numpy as np
+import pandas as pd
+from schema import coerce_column
+
+class ColumnBuilder:
+    """Converts one column chunk by chunk into its compact storage type"""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.raw_bytes = 0
+        self._chunks = []
+        self._categories = {}
+
+    def append(self, values):
+        """Convert a list of raw cell values and keep only the compact result"""
+        # What an object/float64 column would have cost: 8 bytes per cell
+        # plus the boxed string for text cells
+        self.raw_bytes += 8 * len(values) + sum(sys.getsizeof(value) for value in values if isinstance(value, str))
+
+        if self.kind == 'category':
+            # Encode straight to integer codes, so strings are stored once
+            codes = np.empty(len(values), dtype='int32')
+            categories = self._categories
+            for i, value in enumerate(values):
+                value = '' if value is None else str(value)
+                code = categories.get(value)
+                if code is None:
+                    code = categories[value] = len(categories)
+                codes[i] = code
+            self._chunks.append(codes)
+        else:
+            self._chunks.append(coerce_column(pd.Series(values, dtype=object), self.kind).to_numpy())
+
+    def finish(self):
+        """Return the finished column as an array or Categorical"""
+        if self.kind == 'category':
+            codes = np.concatenate(self._chunks) if self._chunks else np.empty(0, dtype='int32')
+            return pd.Categorical.from_codes(codes, categories=list(self._categories))
+        if not self._chunks:
+            return np.empty(0, dtype=object if self.kind is None else None)
+        values = np.concatenate(self._chunks)
+        if self.kind is None:
+            # Undeclared columns keep whatever type pandas infers for them
+            return pd.Series(values, dtype=object).infer_objects().to_numpy()
+        return values
+
+def _read_sheet(worksheet, schema, chunk_rows):
+    """Stream one worksheet into a compact DataFrame, ``chunk_rows`` at a time"""
+    rows = worksheet.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame(), {'rows': 0, 'before_bytes': 0}
+
+    # Unnamed columns are spreadsheet padding, not data
+    positions = [i for i, name in enumerate(header) if name is not None]
+    names = [str(header[i]) for i in positions]
+    builders = [ColumnBuilder(schema.get(name)) for name in names]
+
+    def flush(chunk):
+        for builder, position in zip(builders, positions):
+            builder.append([row[position] if position < len(row) else None for row in chunk])
+
+    chunk = []
+    row_count = 0
+    for row in rows:
+        if all(value is None for value in row):
+            continue
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            flush(chunk)
+            row_count += len(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+        row_count += len(chunk)
+
+    df = pd.DataFrame({name: builder.finish() for name, builder in zip(names, builders)})
+    return df, {'rows': row_count, 'before_bytes': sum(builder.raw_bytes for builder in builders)}
+
+def read_workbook(path, sheets, chunk_rows):
+    """Read several sheets in one pass over the workbook with bounded memory.
+
+    ``sheets`` maps sheet name → schema. Returns a dict of DataFrames and a
+    dict of per-sheet ingest statistics.
+    """
+    # Only needed when a workbook is parsed; snapshot loads skip it
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        frames = {}
+        stats = {}
+        for sheet_name, schema in sheets.items():
+            frames[sheet_name], stats[sheet_name] = _read_sheet(workbook[sheet_name], schema, chunk_rows)
+        return frames, stats
+    finally:
+        workbook.close()